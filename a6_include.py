@@ -3,7 +3,12 @@
 # Description: Provided data structures necessary to complete the assignment.
 #              Please look through this file carefully to see what methods
 #              are available and how they're implemented.
-#              Don't modify the contents of this file.
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -96,6 +101,345 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Numbers below this are looked up in a sieve built on first use; larger ones are tested with Miller-Rabin
+PRIME_SIEVE_LIMIT = 1 << 16
+
+# Miller-Rabin with these bases gives the right answer for every number below 3.3 * 10 ** 24
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+_prime_sieve = None
+
+
+def _get_prime_sieve() -> bytearray:
+    """
+    Return a bytearray whose entry n is 1 if n is prime, for every n below PRIME_SIEVE_LIMIT. It is built the first
+    time it is needed and then reused.
+    """
+    global _prime_sieve
+    if _prime_sieve is None:
+        sieve = bytearray([1]) * PRIME_SIEVE_LIMIT
+        sieve[0] = sieve[1] = 0
+        factor = 2
+        while factor * factor < PRIME_SIEVE_LIMIT:
+            if sieve[factor]:
+                sieve[factor * factor::factor] = bytes(len(range(factor * factor, PRIME_SIEVE_LIMIT, factor)))
+            factor += 1
+        _prime_sieve = sieve
+    return _prime_sieve
+
+
+def is_prime(number: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean. Small numbers are looked up in the sieve and
+    larger ones take a few modular exponentiations instead of trial division up to their square root.
+    """
+    if number < PRIME_SIEVE_LIMIT:
+        return number > 1 and _get_prime_sieve()[number] == 1
+    for base in MILLER_RABIN_BASES:
+        if number % base == 0:
+            return False
+
+    # write number - 1 as odd * 2 ** twos
+    odd = number - 1
+    twos = 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+
+    for base in MILLER_RABIN_BASES:
+        value = pow(base, odd, number)
+        if value == 1 or value == number - 1:
+            continue
+        squarings = 1
+        while squarings < twos:
+            value = value * value % number
+            if value == number - 1:
+                break
+            squarings += 1
+        else:
+            return False
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Increment from given number to find the closest prime number, exactly like the hash maps' _next_prime(): an
+    even number is first moved to the next odd number, so next_prime(2) is 3.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+# Stable ids for the provided hash functions, so files written by a hash map can record which one it used
+HASH_FUNCTION_IDS = {1: hash_function_1, 2: hash_function_2}
+
+
+def hash_function_id(function) -> int:
+    """Return the stable id of one of the provided hash functions, raising ValueError for any other function."""
+    for function_id, known_function in HASH_FUNCTION_IDS.items():
+        if known_function is function:
+            return function_id
+    raise ValueError(f"{function!r} has no stable id; only hash_function_1 and hash_function_2 can be stored")
+
+
+# Keys longer than this could overflow the 64 bit sums used by the vectorized hashes, so they are hashed one at a time
+MAX_VECTORIZED_KEY_LENGTH = 4_000_000
+
+
+# Hashes are cached, stored and sent between processes as unsigned 64 bit integers, reduced with & HASH_MASK
+HASH_MASK = 2 ** 64 - 1
+
+
+def mix_hash(hash_value: int) -> int:
+    """
+    Return the 64 bit MurmurHash3 finalizer (fmix64) of a hash. Every input bit affects every output bit, so hashes
+    that only differ in a few bits, or keys that collide in their low bits, end up spread over all 64 bits.
+    """
+    hash_value &= HASH_MASK
+    hash_value ^= hash_value >> 33
+    hash_value = (hash_value * 0xFF51AFD7ED558CCD) & HASH_MASK
+    hash_value ^= hash_value >> 33
+    hash_value = (hash_value * 0xC4CEB9FE1A85EC53) & HASH_MASK
+    hash_value ^= hash_value >> 33
+    return hash_value
+
+
+def mix_hashes(hashes: list) -> list:
+    """
+    Return mix_hash() of every hash in hashes, computed in one vectorized pass when NumPy is installed.
+    """
+    if numpy is None or not hashes:
+        return [mix_hash(hash_value) for hash_value in hashes]
+    try:
+        values = numpy.array(hashes, dtype=numpy.uint64)
+    except OverflowError:
+        return [mix_hash(hash_value) for hash_value in hashes]
+    # uint64 multiplication wraps around at 2 ** 64, exactly like the masking in mix_hash()
+    values ^= values >> numpy.uint64(33)
+    values *= numpy.uint64(0xFF51AFD7ED558CCD)
+    values ^= values >> numpy.uint64(33)
+    values *= numpy.uint64(0xC4CEB9FE1A85EC53)
+    values ^= values >> numpy.uint64(33)
+    return values.tolist()
+
+
+class MixedHashFunction:
+    """
+    Hash function that applies mix_hash() to the result of another hash function, used by the hash maps' power of
+    two mode so that weak hash functions like hash_function_1 still spread over the low bits picked by the mask.
+    """
+
+    def __init__(self, function) -> None:
+        """Initialize the wrapper around the given hash function."""
+        self.function = function
+
+    def __call__(self, key: str) -> int:
+        """Return the mixed hash of the key."""
+        return mix_hash(self.function(key))
+
+
+def batch_hash(function, keys) -> list:
+    """
+    Return a list with the hash of every key in keys, identical to calling function on each one.
+    hash_function_1 and hash_function_2 (also when wrapped in a MixedHashFunction) are computed for the whole batch in
+    one vectorized pass when NumPy is installed; any other function (or a missing NumPy) falls back to calling
+    function per key.
+    """
+    if isinstance(function, MixedHashFunction):
+        return mix_hashes(batch_hash(function.function, keys))
+    keys = list(keys)
+    if numpy is None or (function is not hash_function_1 and function is not hash_function_2) or not keys:
+        return [function(key) for key in keys]
+
+    lengths = numpy.fromiter(map(len, keys), dtype=numpy.int64, count=len(keys))
+    if lengths.max() > MAX_VECTORIZED_KEY_LENGTH:
+        return [function(key) for key in keys]
+
+    code_points = numpy.frombuffer(''.join(keys).encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    ends = numpy.cumsum(lengths)
+    return _hash_code_points(function, code_points, ends - lengths, ends)
+
+
+def batch_hash_packed(function, buffer: bytes, offsets) -> list:
+    """
+    Return the hashes of keys packed back to back as UTF-8 in buffer. Key i is buffer[offsets[i]:offsets[i + 1]], so
+    offsets holds one more element than there are keys. Results are identical to calling function on each decoded key.
+    """
+    if numpy is None or (function is not hash_function_1 and function is not hash_function_2):
+        return [function(bytes(buffer[offsets[i]:offsets[i + 1]]).decode('utf-8'))
+                for i in range(len(offsets) - 1)]
+
+    data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+    bounds = numpy.asarray(offsets, dtype=numpy.int64)
+    if len(bounds) < 2:
+        return []
+    if (data.size and data.max() >= 0x80) or (bounds[1:] - bounds[:-1]).max() > MAX_VECTORIZED_KEY_LENGTH:
+        # Multi-byte characters mean byte offsets no longer line up with characters, so decode the keys first
+        return batch_hash(function, [bytes(buffer[bounds[i]:bounds[i + 1]]).decode('utf-8')
+                                     for i in range(len(bounds) - 1)])
+
+    # Pure ASCII: every byte is a character and its value is the code point
+    return _hash_code_points(function, data, bounds[:-1], bounds[1:])
+
+
+def _hash_code_points(function, code_points, starts, ends) -> list:
+    """
+    Vectorized hash_function_1 / hash_function_2 over keys stored back to back in code_points, key i spanning
+    code_points[starts[i]:ends[i]]. Each key's hash is the difference of two running sums; the sums wrap around at
+    2 ** 64, but since every individual hash fits in 64 bits the differences are exact.
+    """
+    values = code_points.astype(numpy.uint64)
+    if function is hash_function_2:
+        # 1 based position of every character within its own key
+        positions = numpy.arange(1, values.size + 1, dtype=numpy.uint64)
+        positions -= numpy.repeat(starts, ends - starts).astype(numpy.uint64)
+        values *= positions
+
+    running = numpy.zeros(values.size + 1, dtype=numpy.uint64)
+    numpy.cumsum(values, out=running[1:])
+    return (running[ends] - running[starts]).tolist()
+
+
+class HashMapView:
+    """
+    Live, read-only view over the entries of a hash map, returned by its keys(), values() and items() methods.
+    Iterating a view streams straight from the map's buckets without copying anything, and raises RuntimeError if the
+    map has keys added or removed while the iteration is in progress.
+    """
+
+    def __init__(self, hash_map) -> None:
+        """Initialize the view over the given hash map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return the number of elements in the map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Yield one element per entry of the map."""
+        for entry in self._map._iter_entries():
+            yield self._element(entry)
+
+    def __contains__(self, element: object) -> bool:
+        """Return True if iterating the view would yield the element."""
+        for entry in self._map._iter_entries():
+            if self._element(entry) == element:
+                return True
+        return False
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return type(self).__name__ + '(' + str(list(self)) + ')'
+
+    @staticmethod
+    def _element(entry) -> object:
+        """Return what the view yields for an entry (HashEntry or SLNode)."""
+        raise NotImplementedError
+
+
+class HashMapKeysView(HashMapView):
+    """View over the keys of a hash map."""
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if the key is in the map, with a single lookup."""
+        return self._map.contains_key(key)
+
+    @staticmethod
+    def _element(entry) -> object:
+        """Return the entry's key."""
+        return entry.key
+
+
+class HashMapValuesView(HashMapView):
+    """View over the values of a hash map."""
+
+    @staticmethod
+    def _element(entry) -> object:
+        """Return the entry's value."""
+        return entry.value
+
+
+class HashMapItemsView(HashMapView):
+    """View over the (key, value) pairs of a hash map."""
+
+    def __contains__(self, item: object) -> bool:
+        """Return True if the (key, value) pair is in the map, with a single lookup."""
+        key, value = item
+        entry = self._map._find_entry(key)
+        return entry is not None and entry.value == value
+
+    @staticmethod
+    def _element(entry) -> tuple:
+        """Return the entry's (key, value) pair."""
+        return entry.key, entry.value
+
+
+class HashMapStats:
+    """
+    Counters collected by a hash map between enable_stats() and disable_stats(): a histogram of probe lengths (the
+    number of buckets or chain nodes examined) for each operation and outcome, and the capacity change and time taken
+    by every resize. report() combines them with the bucket occupancy of the table at that moment.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        # (operation, 'hit' or 'miss') -> {probe length: number of operations}
+        self.probe_lengths = {}
+        # (old capacity, new capacity, seconds) for every resize, including in-place rehashes
+        self.resizes = []
+
+    def record_probe(self, operation: str, hit: bool, length: int) -> None:
+        """Count one operation that examined length buckets or nodes."""
+        histogram = self.probe_lengths.setdefault((operation, 'hit' if hit else 'miss'), {})
+        histogram[length] = histogram.get(length, 0) + 1
+
+    def record_resize(self, old_capacity: int, new_capacity: int, seconds: float) -> None:
+        """Count one resize."""
+        self.resizes.append((old_capacity, new_capacity, seconds))
+
+    def add_resize_time(self, seconds: float) -> None:
+        """
+        Add time spent later on the latest resize, such as a step of an incremental resize moving entries. Does nothing
+        if no resize has been counted, when stats were turned on part way through one.
+        """
+        if self.resizes:
+            old_capacity, new_capacity, total = self.resizes[-1]
+            self.resizes[-1] = (old_capacity, new_capacity, total + seconds)
+
+    def report(self, home_counts: list, **extra) -> dict:
+        """
+        Return the collected counters as a dictionary, plus occupancy figures worked out from home_counts, the number
+        of entries whose hash maps to each bucket. With a well spread hash the counts follow a Poisson distribution,
+        whose variance equals its mean, so a dispersion (variance / mean) well above 1 points to a poor hash function.
+        Any extra keyword arguments are added to the dictionary as they are.
+        """
+        buckets = len(home_counts)
+        mean = sum(home_counts) / buckets if buckets else 0.0
+        variance = sum((count - mean) ** 2 for count in home_counts) / buckets if buckets else 0.0
+        occupancy = {}
+        for count in home_counts:
+            occupancy[count] = occupancy.get(count, 0) + 1
+
+        out = {
+            'probe_lengths': {operation + ' ' + outcome: dict(sorted(histogram.items()))
+                              for (operation, outcome), histogram in sorted(self.probe_lengths.items())},
+            'resize_count': len(self.resizes),
+            'resize_seconds': sum(seconds for old_capacity, new_capacity, seconds in self.resizes),
+            'resizes': list(self.resizes),
+            'occupancy_histogram': dict(sorted(occupancy.items())),
+            'occupancy_mean': mean,
+            'occupancy_variance': variance,
+            'occupancy_dispersion': variance / mean if mean else 0.0,
+        }
+        out.update(extra)
+        return out
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +447,16 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash_value: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash_value is the full hash of the key, cached so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash_value = hash_value
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -141,7 +490,7 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, remove, pop, contains, length, iterator
     """
 
     def __init__(self) -> None:
@@ -168,39 +517,72 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash_value: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash_value)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash_value: int = None) -> bool:
         """
         Remove first node with matching key.
+        When hash_value is given, nodes with a different cached hash are skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
+        return self.pop(key, hash_value) is not None
+
+    def pop(self, key: str, hash_value: int = None) -> SLNode:
+        """
+        Remove first node with matching key and return it, or None if no match.
+        When hash_value is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash_value is None or node.hash_value == hash_value) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash_value: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        When hash_value is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash_value is None or node.hash_value == hash_value) and node.key == key:
                 return node
             node = node.next
         return node
 
+    def find(self, key: str, hash_value: int = None) -> (SLNode, SLNode, int):
+        """
+        Return a tuple of the node with matching key (None if no match), the node before it (None if it is the head)
+        and the number of nodes examined, for callers that count them, such as hash map stats.
+        When hash_value is given, nodes with a different cached hash are skipped without comparing keys.
+        """
+        previous, node, examined = None, self._head, 0
+        while node:
+            examined += 1
+            if (hash_value is None or node.hash_value == hash_value) and node.key == key:
+                return node, previous, examined
+            previous, node = node, node.next
+        return None, None, examined
+
+    def unlink(self, node: SLNode, previous: SLNode) -> None:
+        """Remove node, found by find() along with the node before it (None if it is the head)."""
+        if previous:
+            previous.next = node.next
+        else:
+            self._head = node.next
+        self._size -= 1
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
@@ -210,10 +592,14 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash_value: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash_value is the full hash of the key, cached so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
+        self.hash_value = hash_value
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
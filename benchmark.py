@@ -0,0 +1,333 @@
+# Description: This file contains a reproducible benchmark harness comparing the separate chaining HashMap, the open
+# addressing HashMap and the builtin dict. It sweeps key distributions, hash functions, load factors, operation mixes
+# and sizes, reports throughput, per-operation latency percentiles and peak memory, writes the results as JSON and can
+# compare two result files to catch performance regressions.
+#
+# Usage:
+#   python benchmark.py run --sizes 1000 10000 --output results.json
+#   python benchmark.py compare baseline.json results.json --threshold 0.1
+
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from itertools import accumulate
+
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_sc
+import hash_map_swiss
+from a6_include import (hash_function_1, hash_function_2)
+
+
+HASH_FUNCTIONS = {'hash_function_1': hash_function_1, 'hash_function_2': hash_function_2}
+
+# Fractions of get, put and remove operations in each mix
+MIXES = {
+    'read_heavy': (0.90, 0.05, 0.05),
+    'balanced': (0.50, 0.30, 0.20),
+    'write_heavy': (0.10, 0.60, 0.30),
+}
+
+DISTRIBUTIONS = ('uniform', 'zipf', 'anagram')
+
+# Implementations that always run at their own load factor
+FIXED_LOADS = {'swiss': hash_map_swiss.MAX_LOAD, 'cuckoo': hash_map_cuckoo.MAX_LOAD[4]}
+
+# Operations timed one by one for the latency percentiles (the throughput pass runs untimed)
+LATENCY_SAMPLES = 10000
+
+# Key used to match results between two runs
+RESULT_KEY = ('implementation', 'distribution', 'hash_function', 'max_load', 'mix', 'size')
+
+
+class DictMap:
+    """
+    Adapter giving the builtin dict the same put / get / remove interface as the hash maps.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the empty dict."""
+        self._data = {}
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update an item."""
+        self._data[key] = value
+
+    def get(self, key: str) -> object:
+        """Return the value of the key, or None."""
+        return self._data.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove the key if it is present."""
+        self._data.pop(key, None)
+
+
+def make_map(implementation: str, function, max_load: float):
+    """
+    Create an empty map of the given implementation. Raises ValueError if the load factor is not valid for it.
+    """
+    if implementation == 'sc':
+        return hash_map_sc.HashMap(11, function, max_load=max_load)
+    if implementation == 'oa':
+        return hash_map_oa.HashMap(11, function, max_load=max_load)
+    if implementation == 'oa_robin_hood':
+        return hash_map_oa.HashMap(11, function, hash_map_oa.ROBIN_HOOD, max_load=max_load)
+    if implementation == 'sc_pow2':
+        return hash_map_sc.HashMap(11, function, max_load=max_load, power_of_two=True)
+    if implementation == 'oa_pow2':
+        return hash_map_oa.HashMap(11, function, max_load=max_load, power_of_two=True)
+    if implementation in FIXED_LOADS and max_load != FIXED_LOADS[implementation]:
+        raise ValueError(f"{implementation} always uses a max_load of {FIXED_LOADS[implementation]}")
+    if implementation == 'swiss':
+        return hash_map_swiss.HashMap(11, function)
+    if implementation == 'cuckoo':
+        # the second bucket comes from the other provided hash function
+        other = hash_function_2 if function is hash_function_1 else hash_function_1
+        return hash_map_cuckoo.HashMap(11, function, other)
+    if implementation == 'dict':
+        return DictMap()
+    raise ValueError(f"unknown implementation {implementation!r}")
+
+
+IMPLEMENTATIONS = ('sc', 'oa', 'oa_robin_hood', 'sc_pow2', 'oa_pow2', 'swiss', 'cuckoo', 'dict')
+
+
+def make_keys(distribution: str, size: int, rng: random.Random) -> list:
+    """
+    Return size distinct keys. Uniform and Zipfian keys are random lowercase strings; anagram keys are shuffles of a
+    few base strings, so every group of anagrams has the same hash_function_1 value and collides.
+    """
+    keys = set()
+    if distribution == 'anagram':
+        bases = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(12))
+                 for _ in range(max(1, size // 1000))]
+        while len(keys) < size:
+            letters = list(rng.choice(bases))
+            rng.shuffle(letters)
+            keys.add(''.join(letters))
+    else:
+        while len(keys) < size:
+            keys.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(6, 14))))
+    return sorted(keys)
+
+
+def make_operations(distribution: str, keys: list, mix: tuple, count: int, rng: random.Random) -> list:
+    """
+    Return count (operation, key) pairs, with operation 0 for get, 1 for put and 2 for remove. Keys are drawn from
+    twice as many candidates as were loaded, so about half the lookups miss; Zipfian draws favour a few hot keys.
+    """
+    universe = keys + [key + '#' for key in keys]
+    rng.shuffle(universe)
+    if distribution == 'zipf':
+        weights = list(accumulate(1 / (rank ** 1.1) for rank in range(1, len(universe) + 1)))
+        picks = [bisect_left(weights, rng.random() * weights[-1]) for _ in range(count)]
+    else:
+        picks = [rng.randrange(len(universe)) for _ in range(count)]
+
+    read, write = mix[0], mix[0] + mix[1]
+    operations = []
+    for pick in picks:
+        roll = rng.random()
+        operations.append((0 if roll < read else 1 if roll < write else 2, universe[pick]))
+    return operations
+
+
+def run_operations(hash_map, operations: list) -> None:
+    """
+    Apply the operations to the map without timing each one.
+    """
+    get, put, remove = hash_map.get, hash_map.put, hash_map.remove
+    for operation, key in operations:
+        if operation == 0:
+            get(key)
+        elif operation == 1:
+            put(key, key)
+        else:
+            remove(key)
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Return the value at the given fraction of a sorted list (nearest rank).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def benchmark_case(implementation: str, distribution: str, function_name: str, max_load: float, mix: str,
+                   size: int, operations: int, seed: int) -> dict:
+    """
+    Run one benchmark case and return its result. The map is loaded with size keys to time the build, and loaded
+    again in a separate pass while tracemalloc records the peak memory, since tracing slows down every allocation.
+    Then the operations are run once untimed per operation for throughput, and a sample of them is replayed with each
+    operation timed for the latency percentiles.
+    """
+    rng = random.Random(seed)
+    keys = make_keys(distribution, size, rng)
+    workload = make_operations(distribution, keys, MIXES[mix], operations, rng)
+    function = HASH_FUNCTIONS.get(function_name)
+
+    started = time.perf_counter()
+    hash_map = make_map(implementation, function, max_load)
+    for key in keys:
+        hash_map.put(key, key)
+    build_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    traced_map = make_map(implementation, function, max_load)
+    for key in keys:
+        traced_map.put(key, key)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del traced_map
+
+    started = time.perf_counter()
+    run_operations(hash_map, workload)
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    clock = time.perf_counter_ns
+    get, put, remove = hash_map.get, hash_map.put, hash_map.remove
+    for operation, key in workload[:LATENCY_SAMPLES]:
+        before = clock()
+        if operation == 0:
+            get(key)
+        elif operation == 1:
+            put(key, key)
+        else:
+            remove(key)
+        latencies.append(clock() - before)
+    latencies.sort()
+
+    return {
+        'implementation': implementation,
+        'distribution': distribution,
+        'hash_function': function_name,
+        'max_load': max_load,
+        'mix': mix,
+        'size': size,
+        'operations': operations,
+        'build_seconds': build_seconds,
+        'ops_per_sec': operations / elapsed if elapsed else float('inf'),
+        'p50_ns': percentile(latencies, 0.50),
+        'p99_ns': percentile(latencies, 0.99),
+        'peak_bytes': peak_bytes,
+    }
+
+
+def run_suite(implementations, distributions, function_names, loads, mixes, sizes, operations: int, seed: int,
+              log=sys.stderr) -> dict:
+    """
+    Run every combination of the given settings and return the results with some information about the machine.
+    The builtin dict ignores the hash function and load factor, so it runs once per distribution, mix and size, and
+    the swiss and cuckoo tables run once per hash function at their fixed load factor.
+    Combinations a map does not accept (such as a load factor above 0.5 with quadratic probing, or keys whose hashes
+    the cuckoo table cannot tell apart) are skipped.
+    """
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            for mix in mixes:
+                for implementation in implementations:
+                    if implementation == 'dict':
+                        settings = [('builtin', None)]
+                    elif implementation in FIXED_LOADS:
+                        settings = [(name, FIXED_LOADS[implementation]) for name in function_names]
+                    else:
+                        settings = [(name, load) for name in function_names for load in loads]
+                    for function_name, max_load in settings:
+                        try:
+                            result = benchmark_case(implementation, distribution, function_name, max_load, mix,
+                                                    size, operations or size, seed)
+                        except ValueError as error:
+                            print(f"skipped {implementation} {function_name} {max_load}: {error}", file=log)
+                            continue
+                        print(f"{implementation:14} {distribution:8} {function_name:16} {str(max_load):5} {mix:12} "
+                              f"{size:>9}  {result['ops_per_sec']:>12,.0f} ops/s  p50 {result['p50_ns']:>7,.0f} ns  "
+                              f"p99 {result['p99_ns']:>8,.0f} ns  peak {result['peak_bytes']:>12,} B", file=log)
+                        results.append(result)
+
+    return {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Match the cases of two result sets and return a list of (case, baseline ops/sec, current ops/sec, change) for
+    every case whose throughput dropped by more than threshold (a fraction, e.g. 0.1 for 10%).
+    """
+    baseline_cases = {tuple(result[field] for field in RESULT_KEY): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        case = tuple(result[field] for field in RESULT_KEY)
+        if case not in baseline_cases:
+            continue
+        before = baseline_cases[case]['ops_per_sec']
+        change = (result['ops_per_sec'] - before) / before
+        if change < -threshold:
+            regressions.append((case, before, result['ops_per_sec'], change))
+    return regressions
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point. Returns the exit status: 1 if compare found a regression, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the hash map implementations against dict.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmark sweep')
+    run.add_argument('--implementations', nargs='+', default=list(IMPLEMENTATIONS), choices=IMPLEMENTATIONS)
+    run.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS)
+    run.add_argument('--hash-functions', nargs='+', default=list(HASH_FUNCTIONS), choices=list(HASH_FUNCTIONS))
+    run.add_argument('--loads', nargs='+', type=float, default=[0.5, 0.75, 0.9])
+    run.add_argument('--mixes', nargs='+', default=list(MIXES), choices=list(MIXES))
+    run.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000],
+                     help='numbers of keys loaded before the operations run (e.g. 1000 up to 10000000)')
+    run.add_argument('--operations', type=int, default=0, help='operations per case (default: the size)')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--output', help='write the results to this JSON file')
+
+    compare = commands.add_parser('compare', help='compare two result files')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='fractional throughput drop reported as a regression (default 0.10)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        report = run_suite(args.implementations, args.distributions, args.hash_functions, args.loads, args.mixes,
+                           args.sizes, args.operations, args.seed)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=2)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare_results(baseline, current, args.threshold)
+    for case, before, after, change in regressions:
+        print(f"REGRESSION {' '.join(str(field) for field in case)}: {before:,.0f} -> {after:,.0f} ops/s "
+              f"({change:+.1%})")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# Description: This file contains code for a bounded LRUCache class layered on the separate chaining HashMap. Each
+# cached item is a CacheNode stored as the value in the map and threaded onto an intrusive doubly linked recency list,
+# so lookups, updates and evicting the least recently used item are all O(1). The cache can be limited by number of
+# items and by estimated size in bytes, and items can be given a time to live.
+
+
+import sys
+import time
+
+from a6_include import (hash_function_1, hash_function_2)
+from hash_map_sc import HashMap
+
+
+class CacheNode:
+    """
+    Cached item: a key / value pair plus its hash, size, expiry time and its links in the recency list.
+    """
+
+    def __init__(self, key: str, value: object, hash_value: int, size: int, expires: float = None) -> None:
+        self.key = key
+        self.value = value
+        # hash of the key, kept so that the item can be removed from the map without hashing the key again
+        self.hash_value = hash_value
+        self.size = size
+        # clock() time after which the item is stale, or None if it never expires
+        self.expires = expires
+        # neighbours in the recency list; older is towards the least recently used end
+        self.older = None
+        self.newer = None
+
+
+def default_sizeof(key: str, value: object) -> int:
+    """
+    Estimate the memory used by a cached item as the shallow size of its key and value.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 ttl: float = None,
+                 function: callable = hash_function_1,
+                 sizeof: callable = default_sizeof,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new LRUCache.
+        max_entries - most items the cache holds before evicting the least recently used one
+        max_bytes - most total size (as estimated by sizeof(key, value)) the cache holds before evicting
+        ttl - default time to live in seconds for new items, None to keep items until they are evicted
+        clock - function returning the current time in seconds, used for the time to live
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"max_bytes must be at least 1, got {max_bytes}")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl must be positive, got {ttl}")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._hash_function = function
+        self._sizeof = sizeof
+        self._clock = clock
+        self._map = HashMap(11 if max_entries is None else max_entries, function, max_load=1.0)
+        self._bytes = 0
+
+        # Sentinel node: _head.newer is the least recently used item and _head.older the most recently used one
+        self._head = CacheNode(None, None, 0, 0)
+        self._head.older = self._head
+        self._head.newer = self._head
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output, from least to most recently used
+        """
+        out = ''
+        node = self._head.newer
+        while node is not self._head:
+            out += str(node.key) + ': ' + str(node.value) + '\n'
+            node = node.newer
+        return out
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached items, including any that have expired but not been removed yet.
+        """
+        return self._map.get_size()
+
+    def get_size(self) -> int:
+        """
+        Return the number of cached items, including any that have expired but not been removed yet.
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return the total estimated size of the cached items.
+        """
+        return self._bytes
+
+    def get_stats(self) -> dict:
+        """
+        Return a dictionary with the hit, miss, eviction and expiration counters and the hit rate.
+        """
+        lookups = self._hits + self._misses
+        return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                'expirations': self._expirations, 'hit_rate': self._hits / lookups if lookups else 0.0}
+
+    def reset_stats(self) -> None:
+        """
+        Set the hit, miss, eviction and expiration counters back to zero.
+        """
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    # ------------------------------------------------------------------ #
+
+    def _unlink(self, node: CacheNode) -> None:
+        """
+        Take a node out of the recency list.
+        """
+        node.older.newer = node.newer
+        node.newer.older = node.older
+
+    def _link_newest(self, node: CacheNode) -> None:
+        """
+        Add a node to the most recently used end of the recency list.
+        """
+        node.older = self._head.older
+        node.newer = self._head
+        self._head.older.newer = node
+        self._head.older = node
+
+    def _is_expired(self, node: CacheNode) -> bool:
+        """
+        Return True if the node's time to live has run out.
+        """
+        return node.expires is not None and self._clock() >= node.expires
+
+    def _discard(self, node: CacheNode) -> None:
+        """
+        Remove a node from both the map and the recency list, using the hash stored in the node.
+        """
+        self._map._remove_hashed(node.key, node.hash_value)
+        self._unlink(node)
+        self._bytes -= node.size
+
+    def _evict(self) -> None:
+        """
+        Evict least recently used items until the cache is back within its limits. Items that have already expired
+        are counted as expirations rather than evictions.
+        """
+        while self._head.newer is not self._head and (
+                (self._max_entries is not None and self._map.get_size() > self._max_entries) or
+                (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            node = self._head.newer
+            if self._is_expired(node):
+                self._expirations += 1
+            else:
+                self._evictions += 1
+            self._discard(node)
+
+    def _lookup(self, key: str, hash_value: int) -> CacheNode:
+        """
+        Find the live node for a key, dropping it if it has expired, and mark it as the most recently used.
+        Returns None on a miss. Updates the hit and miss counters.
+        """
+        list_head, map_node = self._map._find(key, hash_value)
+        if map_node is None:
+            self._misses += 1
+            return None
+        node = map_node.value
+        if self._is_expired(node):
+            self._expirations += 1
+            self._misses += 1
+            self._discard(node)
+            return None
+
+        self._hits += 1
+        self._unlink(node)
+        self._link_newest(node)
+        return node
+
+    def _store(self, key: str, value: object, hash_value: int, ttl: float = None) -> None:
+        """
+        Add or replace a key whose hash has already been calculated, making it the most recently used item, then
+        evict whatever no longer fits.
+        """
+        if ttl is None:
+            ttl = self._ttl
+        node = CacheNode(key, value, hash_value, self._sizeof(key, value),
+                         None if ttl is None else self._clock() + ttl)
+
+        list_head, map_node = self._map._find(key, hash_value)
+        if map_node is not None:
+            old_node = map_node.value
+            self._unlink(old_node)
+            self._bytes -= old_node.size
+            map_node.value = node
+        else:
+            self._map._insert_new(list_head, key, node, hash_value)
+            self._map._apply_growth_policy()
+        self._link_newest(node)
+        self._bytes += node.size
+        self._evict()
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Adds an item to the cache (or replaces it if it already exists) as the most recently used item, evicting the
+        least recently used items if the cache goes over its limits.
+        ttl overrides the cache's default time to live for this item.
+        """
+        self._store(key, value, self._hash_function(key), ttl)
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value associated with the given key and marks it as the most recently used item.
+        If the key is not cached or has expired, the method returns default.
+        """
+        node = self._lookup(key, self._hash_function(key))
+        if node is None:
+            return default
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is cached and has not expired, otherwise it returns False.
+        It does not change the recency order or the counters.
+        """
+        list_head, map_node = self._map._find(key, self._hash_function(key))
+        return map_node is not None and not self._is_expired(map_node.value)
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Support the in operator, same as contains_key().
+        """
+        return self.contains_key(key)
+
+    def get_or_insert(self, key: str, factory: callable, ttl: float = None) -> object:
+        """
+        This method returns the cached value of the given key. On a miss (or if the item has expired) factory() is
+        called to load the value, which is cached and returned. The key is hashed only once.
+        """
+        hash_value = self._hash_function(key)
+        node = self._lookup(key, hash_value)
+        if node is not None:
+            return node.value
+        value = factory()
+        self._store(key, value, hash_value, ttl)
+        return value
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key from the cache. If the key is not cached, the method does nothing.
+        """
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        This method removes the given key from the cache and returns its value. If the key is not cached or has
+        expired, default is returned instead.
+        """
+        hash_value = self._hash_function(key)
+        list_head, map_node = self._map._find(key, hash_value)
+        if map_node is None:
+            return default
+        node = map_node.value
+        self._discard(node)
+        if self._is_expired(node):
+            self._expirations += 1
+            return default
+        return node.value
+
+    def purge_expired(self) -> int:
+        """
+        This method removes every expired item from the cache and returns how many were removed. Expired items are
+        otherwise only removed when they are looked up or reach the least recently used end of the list.
+        """
+        removed = 0
+        node = self._head.newer
+        while node is not self._head:
+            next_node = node.newer
+            if self._is_expired(node):
+                self._discard(node)
+                removed += 1
+            node = next_node
+        self._expirations += removed
+        return removed
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the cache. The counters are kept.
+        """
+        self._map.clear()
+        self._head.older = self._head
+        self._head.newer = self._head
+        self._bytes = 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU eviction example")
+    print("--------------------")
+    c = LRUCache(max_entries=3, function=hash_function_2)
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(c, c.get_stats())
+
+    print("\nByte limit example")
+    print("------------------")
+    c = LRUCache(max_bytes=200, sizeof=lambda key, value: len(value))
+    for i in range(5):
+        c.put(str(i), 'x' * 60)
+    print(c.get_size(), c.get_bytes(), c.get_stats()['evictions'])
+
+    print("\nTime to live example")
+    print("--------------------")
+    now = [0.0]
+    c = LRUCache(ttl=10, clock=lambda: now[0])
+    c.put('short', 1, ttl=1)
+    c.put('long', 2)
+    now[0] = 5.0
+    print(c.get('short'), c.get('long'), c.contains_key('long'))
+    now[0] = 20.0
+    print(c.purge_expired(), c.get_size(), c.get_stats())
+
+    print("\nHash reuse example")
+    print("------------------")
+    # each key is hashed once when it is looked up; evicting it or purging it once it expires uses the stored hash
+    hashed = []
+
+    def counting_hash(key: str) -> int:
+        hashed.append(key)
+        return hash_function_1(key)
+
+    now = [0.0]
+    c = LRUCache(max_entries=5, ttl=10, function=counting_hash, clock=lambda: now[0])
+    for i in range(20):
+        c.put('key' + str(i), i)
+    result = len(hashed) == 20 and c.get_stats()['evictions'] == 15
+    now[0] = 20.0
+    result &= c.purge_expired() == 5 and c.get_size() == 0 and len(hashed) == 20
+    print(len(hashed), c.get_stats()['evictions'], c.get_stats()['expirations'], result)
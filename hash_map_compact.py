@@ -0,0 +1,320 @@
+# Description: This file contains code for a HashMap class, which is implemented using Open Addressing with Quadratic
+# Probing. Instead of one HashEntry object per slot, the table is kept in parallel flat arrays (keys, values, cached
+# hashes and a one byte state per slot), which removes the per-entry object overhead.
+
+
+from array import array
+
+from a6_include import (DynamicArray, HASH_MASK, hash_function_1, hash_function_2, next_prime)
+
+
+# Slot states, stored one byte per slot
+EMPTY = 0
+FILLED = 1
+TOMBSTONE = 2
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) +
+                        ' TS: ' + str(self._states[i] == TOMBSTONE) + '\n')
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty arrays holding the given number of slots.
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', [0]) * capacity
+        self._states = bytearray(capacity)
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash of the key, reduced so that it fits in the unsigned 64 bit hash array.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _find_slot(self, key: str, hash_value: int) -> (int, bool):
+        """
+        Probe for the given key. Returns a tuple of (index, found). When the key is not in the table, the index is the
+        slot the key should be inserted into (the first tombstone along the probe sequence, otherwise the empty slot that
+        ended it), or -1 if the probe sequence had no free slot.
+        """
+        states = self._states
+        capacity = self._capacity
+        initial = hash_value % capacity
+        index = initial
+        insert_index = -1
+
+        j = 0
+        while j < capacity:
+            state = states[index]
+            if state == EMPTY:
+                if insert_index == -1:
+                    insert_index = index
+                return insert_index, False
+            if state == TOMBSTONE:
+                if insert_index == -1:
+                    insert_index = index
+            elif self._hashes[index] == hash_value and self._keys[index] == key:
+                return index, True
+            j += 1
+            index = (initial + j * j) % capacity
+
+        return insert_index, False
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Move every live slot into freshly allocated arrays of the given (prime) capacity. Tombstones are dropped.
+        Keys are known to be unique, so each one goes straight into the first empty slot of its probe sequence.
+        """
+        old_keys, old_values, old_hashes, old_states = self._keys, self._values, self._hashes, self._states
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+        states = self._states
+        index = 0
+        while index < len(old_states):
+            if old_states[index] == FILLED:
+                hash_value = old_hashes[index]
+                initial = hash_value % new_capacity
+                new_index = initial
+                j = 0
+                while states[new_index] != EMPTY:
+                    j += 1
+                    new_index = (initial + j * j) % new_capacity
+                states[new_index] = FILLED
+                self._keys[new_index] = old_keys[index]
+                self._values[new_index] = old_values[index]
+                self._hashes[new_index] = hash_value
+            index += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hashmap (or updates if it already exists). The table is resized if the load factor is
+        >= 0.50, and rehashed at the same capacity if tombstones push the occupied slots over that threshold.
+        """
+        if self.table_load() >= 0.50:
+            self.resize_table(self._capacity * 2)
+        elif (self._size + self._tombstones) / self._capacity >= 0.50:
+            self._rehash(self._capacity)
+
+        hash_value = self._hash(key)
+        index, found = self._find_slot(key, hash_value)
+
+        if found:
+            self._values[index] = value
+            return
+
+        if index == -1:
+            # No free slot along the probe sequence, make room and try again
+            self._rehash(next_prime(self._capacity * 2))
+            index, found = self._find_slot(key, hash_value)
+
+        if self._states[index] == TOMBSTONE:
+            self._tombstones -= 1
+        self._states[index] = FILLED
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = hash_value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+        Load factor = total number of elements stored in the table / number of buckets
+        𝝺 = n / m
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of empty buckets (including tombstones) in the hash table.
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the capacity of the internal hash table. All existing key/value pairs will be copied over into their new
+        hash map location.
+        If the new capacity is not a prime number, the next closest prime will be found and used. The capacity keeps
+        doubling until the table load is below 0.50.
+        """
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+        new_capacity = next_prime(new_capacity)
+        while self._size / new_capacity >= 0.50:
+            new_capacity = next_prime(new_capacity * 2)
+
+        self._rehash(new_capacity)
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        index, found = self._find_slot(key, self._hash(key))
+        if found:
+            return self._values[index]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False. An
+        empty hash map does not contain any keys.
+        """
+        index, found = self._find_slot(key, self._hash(key))
+        return found
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        index, found = self._find_slot(key, self._hash(key))
+        if not found:
+            return
+
+        # Leave a tombstone behind so later probe sequences continue past this slot
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the hash map. It does not change the underlying hash
+        table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array where each index contains a tuple of a key / value pair
+        stored in the hash map.
+        """
+        out_da = DynamicArray()
+
+        index = 0
+        while index < self._capacity:
+            if self._states[index] == FILLED:
+                out_da.append((self._keys[index], self._values[index]))
+            index += 1
+        return out_da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCapacity rounding example")
+    print("-------------------------")
+    m = HashMap(23, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+
+    print("\nResize load example")
+    print("-------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > 0.5:
+            print(f"Check that the load factor is acceptable after the call to resize_table().\n"
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to 0.5")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nSlot layout example")
+    print("-------------------")
+    # the flat arrays hold exactly the table the HashEntry based map builds: same capacity, slots and tombstones
+    import hash_map_oa
+    for function in (hash_function_1, hash_function_2):
+        m = HashMap(53, function)
+        entries = hash_map_oa.HashMap(53, function)
+        for i in range(120):
+            m.put('key' + str(i), i)
+            entries.put('key' + str(i), i)
+        for i in range(0, 120, 4):
+            m.remove('key' + str(i))
+            entries.remove('key' + str(i))
+        result = m.get_capacity() == entries.get_capacity() and m._tombstones == entries.get_tombstone_count()
+        for i in range(m.get_capacity()):
+            entry = entries._buckets[i]
+            if entry is None:
+                result &= m._states[i] == EMPTY
+            elif entry.is_tombstone:
+                result &= m._states[i] == TOMBSTONE
+            else:
+                result &= m._states[i] == FILLED and m._keys[i] == entry.key and m._values[i] == entry.value
+        print(m.get_size(), m.get_capacity(), m._tombstones, result)
+
+    print("\nMemory example")
+    print("--------------")
+    import tracemalloc
+    keys = ['key' + str(i) for i in range(5000)]
+    traced = []
+    for map_class in (hash_map_oa.HashMap, HashMap):
+        tracemalloc.start()
+        m = map_class(53, hash_function_2)
+        for key in keys:
+            m.put(key, 0)
+        traced.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+    print(traced[0], traced[1], traced[1] < traced[0])
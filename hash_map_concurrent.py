@@ -0,0 +1,265 @@
+# Description: This file contains code for a thread-safe ConcurrentHashMap class. Keys are split across a fixed number
+# of segments by hash; each segment is a separate chaining HashMap guarded by its own lock (lock striping), so
+# threads working on different segments never block each other.
+
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from a6_include import (DynamicArray, hash_function_1, hash_function_2)
+from hash_map_sc import HashMap
+
+
+class ConcurrentHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 max_load: float = 1.0,
+                 growth_factor: float = 2.0) -> None:
+        """
+        Initialize new ConcurrentHashMap made of the given number of lock striped segments.
+        capacity is the total number of buckets to start with, spread evenly over the segments. Each segment grows on
+        its own once its load factor goes above max_load, holding only its own lock while it rehashes.
+        """
+        if stripes < 1:
+            raise ValueError(f"stripes must be at least 1, got {stripes}")
+        self._hash_function = function
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._segments = [HashMap(max(1, capacity // stripes), function, max_load=max_load,
+                                  growth_factor=growth_factor)
+                          for _ in range(stripes)]
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for stripe in range(self._stripes):
+            with self._locks[stripe]:
+                out += 'segment ' + str(stripe) + ':\n' + str(self._segments[stripe])
+        return out
+
+    def _stripe(self, hash_value: int) -> int:
+        """
+        Return the segment that owns the given hash.
+        """
+        return hash_value % self._stripes
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Segments are read one after another, so under concurrent updates this is a snapshot that
+        may be slightly out of date.
+        """
+        return sum(segment.get_size() for segment in self._segments)
+
+    def get_capacity(self) -> int:
+        """
+        Return the total number of buckets over all segments.
+        """
+        return sum(segment.get_capacity() for segment in self._segments)
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hash map (or updates it if it already exists). The key is hashed before the segment lock
+        is taken, so the lock is only held for the bucket update itself.
+        """
+        hash_value = self._hash_function(key)
+        stripe = self._stripe(hash_value)
+        with self._locks[stripe]:
+            segment = self._segments[stripe]
+            segment._put_hashed(key, value, hash_value)
+            segment._apply_growth_policy()
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        hash_value = self._hash_function(key)
+        stripe = self._stripe(hash_value)
+        with self._locks[stripe]:
+            return self._segments[stripe]._get_hashed(key, hash_value)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False.
+        """
+        hash_value = self._hash_function(key)
+        stripe = self._stripe(hash_value)
+        with self._locks[stripe]:
+            list_head, node = self._segments[stripe]._find(key, hash_value)
+            return node is not None
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing.
+        """
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        This method removes the given key from the hash map and returns its value. If the key is not in the hash map,
+        default is returned instead.
+        """
+        hash_value = self._hash_function(key)
+        stripe = self._stripe(hash_value)
+        with self._locks[stripe]:
+            node = self._segments[stripe]._remove_hashed(key, hash_value)
+        if node is None:
+            return default
+        return node.value
+
+    def get_or_insert(self, key: str, factory: callable) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, factory() is called to
+        create its value, which is added and returned. The check and the insert happen atomically under the segment
+        lock, so factory() is called at most once per key even when several threads race on it.
+        """
+        hash_value = self._hash_function(key)
+        stripe = self._stripe(hash_value)
+        with self._locks[stripe]:
+            segment = self._segments[stripe]
+            list_head, node = segment._find(key, hash_value)
+            if node is not None:
+                return node.value
+            value = factory()
+            segment._insert_new(list_head, key, value, hash_value)
+            segment._apply_growth_policy()
+            return value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, it is added with the
+        value default, which is then returned.
+        """
+        return self.get_or_insert(key, lambda: default)
+
+    def table_load(self) -> float:
+        """
+        This method returns the load factor over all segments.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of empty buckets over all segments.
+        """
+        return sum(segment.empty_buckets() for segment in self._segments)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the map to roughly new_capacity buckets in total. Segments are rehashed one at a time, each under
+        only its own lock, so the rest of the map stays available while the resize is in progress.
+        """
+        segment_capacity = max(1, new_capacity // self._stripes)
+        for stripe in range(self._stripes):
+            with self._locks[stripe]:
+                self._segments[stripe].resize_table(segment_capacity)
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the hash map, one segment at a time.
+        """
+        for stripe in range(self._stripes):
+            with self._locks[stripe]:
+                self._segments[stripe].clear()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array where each index contains a tuple of a key / value pair. Each segment is
+        copied under its own lock, so the result is consistent per segment.
+        """
+        out_da = DynamicArray()
+        for stripe in range(self._stripes):
+            with self._locks[stripe]:
+                for pair in self._segments[stripe].items():
+                    out_da.append(pair)
+        return out_da
+
+
+class GlobalLockHashMap:
+    """
+    Baseline for the contention benchmark: a single separate chaining HashMap behind one lock.
+    """
+
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1) -> None:
+        """Initialize the map and its lock."""
+        self._lock = threading.Lock()
+        self._map = HashMap(capacity, function, max_load=1.0)
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update an item while holding the global lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """Look up an item while holding the global lock."""
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove an item while holding the global lock."""
+        with self._lock:
+            self._map.remove(key)
+
+
+def benchmark_contention(hash_map, threads: int, operations: int, key_count: int, read_ratio: float = 0.8,
+                         seed: int = 0) -> float:
+    """
+    Run operations map operations spread over a pool of threads against hash_map, with read_ratio of them being
+    get() calls and the rest put() or remove(). Returns the number of operations per second.
+    """
+    rng = random.Random(seed)
+    keys = ['key' + str(rng.randrange(key_count)) for _ in range(operations)]
+    choices = [rng.random() for _ in range(operations)]
+    chunk = operations // threads
+
+    def worker(start: int) -> None:
+        index = start
+        while index < start + chunk:
+            if choices[index] < read_ratio:
+                hash_map.get(keys[index])
+            elif choices[index] < read_ratio + (1 - read_ratio) / 2:
+                hash_map.put(keys[index], index)
+            else:
+                hash_map.remove(keys[index])
+            index += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(0, chunk * threads, chunk)))
+    return chunk * threads / (time.perf_counter() - started)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nConcurrent put / get example")
+    print("----------------------------")
+    m = ConcurrentHashMap(53, hash_function_2, stripes=8)
+
+    def fill(offset: int) -> None:
+        for i in range(offset, offset + 1000):
+            m.put(str(i), i * 10)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(fill, range(0, 4000, 1000)))
+    result = True
+    for i in range(4000):
+        result &= m.get(str(i)) == i * 10
+    print(m.get_size(), result, round(m.table_load(), 2))
+
+    print("\nContention benchmark (ops/sec)")
+    print("------------------------------")
+    for threads in (1, 2, 4, 8):
+        single = benchmark_contention(GlobalLockHashMap(1009, hash_function_2), threads, 200000, 20000)
+        striped = benchmark_contention(ConcurrentHashMap(1009, hash_function_2), threads, 200000, 20000)
+        print(f"threads {threads}: global lock {single:,.0f}  striped {striped:,.0f}")
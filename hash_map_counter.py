@@ -0,0 +1,194 @@
+# Description: This file contains code for a Counter class that counts keys in a separate chaining HashMap. Counting
+# hashes each key once, bulk counting hashes whole chunks of an iterable at a time, and most_common(k) uses a heap
+# instead of sorting every key. With max_keys set, the counter switches to the Space-Saving algorithm, which tracks
+# the heavy hitters of an unbounded stream in a fixed number of counters.
+
+
+import heapq
+from itertools import islice
+
+from a6_include import (DynamicArray, batch_hash, hash_function_1, hash_function_2)
+from hash_map_sc import HashMap
+
+
+# Number of keys update() hashes per batch, so an iterable of any length is counted in bounded memory
+UPDATE_CHUNK = 65536
+
+
+class Counter:
+    def __init__(self,
+                 iterable=None,
+                 function: callable = hash_function_1,
+                 max_keys: int = None) -> None:
+        """
+        Initialize new Counter, counting the keys in iterable if one is given.
+        max_keys - if set, at most this many keys are counted at once (Space-Saving). A new key arriving when the
+                   counter is full replaces the key with the lowest count and starts from that count, so the counts
+                   become upper bounds: get_error() returns how much each one may be too high. Any key that occurs
+                   more than get_total() / max_keys times is guaranteed to be counted.
+        """
+        if max_keys is not None and max_keys < 1:
+            raise ValueError(f"max_keys must be at least 1, got {max_keys}")
+        self._hash_function = function
+        self._max_keys = max_keys
+        self._counts = HashMap(11 if max_keys is None else max_keys, function, max_load=1.0)
+        self._total = 0
+        if max_keys is not None:
+            # overestimate of each counted key, and a lazy min-heap of (count, key) used to find the key to replace;
+            # entries are only checked against the real counts when they reach the top
+            self._errors = HashMap(max_keys, function, max_load=1.0)
+            self._heap = []
+        if iterable is not None:
+            self.update(iterable)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        return str(self.most_common())
+
+    def __len__(self) -> int:
+        """
+        Return the number of distinct keys being counted.
+        """
+        return self._counts.get_size()
+
+    def get_size(self) -> int:
+        """
+        Return the number of distinct keys being counted.
+        """
+        return self._counts.get_size()
+
+    def get_total(self) -> int:
+        """
+        Return the sum of all increments, including those of keys replaced in Space-Saving mode.
+        """
+        return self._total
+
+    # ------------------------------------------------------------------ #
+
+    def increment(self, key: str, by: int = 1) -> int:
+        """
+        This method adds by (which must be positive in Space-Saving mode) to the count of the given key and returns
+        the new count. The key is only hashed once.
+        """
+        return self._increment_hashed(key, by, self._hash_function(key))
+
+    def _increment_hashed(self, key: str, by: int, hash_value: int) -> int:
+        """
+        Increments a key whose hash has already been calculated.
+        """
+        self._total += by
+        if self._max_keys is None:
+            return self._counts._increment_hashed(key, by, hash_value)
+
+        list_head, node = self._counts._find(key, hash_value)
+        if node is not None:
+            node.value += by
+            return node.value
+
+        error = 0
+        if self._counts.get_size() >= self._max_keys:
+            victim, error = self._pop_min()
+            self._counts.remove(victim)
+            self._errors.remove(victim)
+            list_head, node = self._counts._find(key, hash_value)
+        count = error + by
+        self._counts._insert_new(list_head, key, count, hash_value)
+        self._errors.put(key, error)
+        heapq.heappush(self._heap, (count, key))
+        return count
+
+    def _pop_min(self) -> (str, int):
+        """
+        Removes and returns the counted key with the lowest count, together with that count. Heap entries whose count
+        is out of date are pushed back with the current count until the top of the heap is accurate.
+        """
+        while True:
+            count, key = heapq.heappop(self._heap)
+            current = self._counts.get(key)
+            if current == count:
+                return key, count
+            if current is not None:
+                heapq.heappush(self._heap, (current, key))
+
+    def update(self, iterable) -> None:
+        """
+        Counts every key in iterable. Keys are hashed in batches of UPDATE_CHUNK, so iterables far larger than memory
+        (such as a generator over a file) can be counted.
+        """
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, UPDATE_CHUNK))
+            if not chunk:
+                return
+            hashes = batch_hash(self._hash_function, chunk)
+            index = 0
+            while index < len(chunk):
+                self._increment_hashed(chunk[index], 1, hashes[index])
+                index += 1
+
+    def get(self, key: str) -> int:
+        """
+        This method returns the count of the given key, or 0 if the key is not being counted.
+        """
+        count = self._counts.get(key)
+        return 0 if count is None else count
+
+    def get_error(self, key: str) -> int:
+        """
+        This method returns how much the count of the given key may be too high. This is always 0 unless max_keys is
+        set.
+        """
+        if self._max_keys is None:
+            return 0
+        error = self._errors.get(key)
+        return 0 if error is None else error
+
+    def items(self):
+        """
+        Returns a view of the (key, count) pairs.
+        """
+        return self._counts.items()
+
+    def most_common(self, k: int = None) -> DynamicArray:
+        """
+        This method returns a dynamic array of the k (key, count) pairs with the highest counts, highest first, or of
+        every pair if k is None. It keeps a heap of k pairs instead of sorting every key, so it runs in O(n log k).
+        """
+        if k is None:
+            pairs = sorted(self._counts.items(), key=lambda pair: pair[1], reverse=True)
+        else:
+            pairs = heapq.nlargest(k, self._counts.items(), key=lambda pair: pair[1])
+        return DynamicArray(pairs)
+
+    def clear(self) -> None:
+        """
+        This method clears every count.
+        """
+        self._counts.clear()
+        self._total = 0
+        if self._max_keys is not None:
+            self._errors.clear()
+            self._heap = []
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCounter example")
+    print("---------------")
+    c = Counter("the quick brown fox jumps over the lazy dog the end".split(), hash_function_2)
+    print(c.most_common(2), c.get('fox'), c.get('cat'), c.get_size(), c.get_total())
+    print(c.increment('fox', 5), c.most_common(2))
+
+    print("\nSpace-Saving example")
+    print("--------------------")
+    stream = (str(i % 7) if i % 3 else str(i) for i in range(30000))
+    c = Counter(stream, hash_function_2, max_keys=20)
+    top = c.most_common(3)
+    for i in range(top.length()):
+        key, count = top[i]
+        print(key, count, c.get_error(key))
+    print(c.get_size(), c.get_total())
@@ -0,0 +1,581 @@
+# Description: This file contains code for a HashMap class, which is implemented using Cuckoo Hashing. Every key has
+# two candidate buckets, each picked from the results of both provided hash functions, so a lookup checks at most two
+# buckets (plus a small stash) no matter how full the table is. An insert that finds both buckets full evicts an entry
+# to its other bucket, following a bounded chain of evictions; an entry left over at the end goes to the stash, and a
+# full stash rehashes the table with new seeds. No seeds can separate keys that share the same pair of hashes, so keys
+# beyond the two buckets' worth a pair can hold go to a small bounded overflow, and put() raises once that is full.
+
+
+import random
+from array import array
+
+from a6_include import (DynamicArray, HASH_MASK, hash_function_1, hash_function_2)
+
+
+# Slots per bucket that may be chosen, and the load factor each one can reliably reach (two choices with one slot per
+# bucket stop working at a load of 1/2, with four slots at about 0.98)
+MAX_LOAD = {1: 0.45, 2: 0.8, 4: 0.9, 8: 0.95}
+
+# Longest chain of evictions an insert follows before the entry it is left holding goes to the stash
+MAX_EVICTIONS = 64
+
+# Entries that may wait in the stash before the table is rehashed
+STASH_SIZE = 4
+
+# Entries that may be kept in the overflow, for keys whose pair of hashes is shared by more keys than its two buckets
+# hold. Once it is full, put() raises ValueError for another such key.
+OVERFLOW_SIZE = 16
+
+# Rehashes tried with new seeds after an insert fails; every REHASHES_PER_GROWTH of them also double the table while it
+# is more than half way to its maximum load, or once MAX_REHASH_ATTEMPTS have failed (see _rehash).
+MAX_REHASH_ATTEMPTS = 6
+REHASHES_PER_GROWTH = 3
+
+
+class HashMap:
+    def __init__(self,
+                 capacity: int,
+                 function_1: callable = hash_function_1,
+                 function_2: callable = hash_function_2,
+                 slots: int = 4,
+                 stash_size: int = STASH_SIZE,
+                 overflow_size: int = OVERFLOW_SIZE,
+                 seed: int = 0) -> None:
+        """
+        Initialize new HashMap that uses
+        cuckoo hashing for collision resolution
+        slots - slots per bucket, one of the keys of MAX_LOAD. More slots per bucket allow a higher load, and let more
+                keys share the same pair of hash values, which hash_function_1 and hash_function_2 often give to
+                several keys.
+        stash_size - entries that may wait in the stash before the table is rehashed
+        overflow_size - entries that may be kept in the overflow (see below)
+        seed - seed for the random multipliers that map each hash to a bucket, so a table's layout can be reproduced
+        Both buckets of a key are picked from its pair of hashes, so keys with the same pair always share the same two
+        buckets, which hold 2 * slots of them, and the stash. Further keys with that pair go to the overflow, which
+        is searched after the stash. Once it holds overflow_size entries, put() raises ValueError for the next such
+        key: the two hash functions cannot tell those keys apart, and they need a stronger hash function (or a map
+        that chains entries). A lookup therefore checks at most two buckets, stash_size and overflow_size entries.
+        """
+        if slots not in MAX_LOAD:
+            raise ValueError(f"slots must be one of {sorted(MAX_LOAD)}, got {slots}")
+        if stash_size < 0:
+            raise ValueError(f"stash_size must not be negative, got {stash_size}")
+        if overflow_size < 0:
+            raise ValueError(f"overflow_size must not be negative, got {overflow_size}")
+        self._slots = slots
+        self._max_load = MAX_LOAD[slots]
+        self._stash_size = stash_size
+        self._overflow_size = overflow_size
+        self._random = random.Random(seed)
+
+        self._function_1 = function_1
+        self._function_2 = function_2
+        self._size = 0
+        # [key, value, hash_1, hash_2] lists that did not fit into either of their buckets, at most stash_size of them
+        self._stash = []
+        # [key, value, hash_1, hash_2] lists of the keys beyond the 2 * slots that share their pair of hashes, at most
+        # overflow_size of them. Unlike the stash, they are not moved by a rehash, since no seeds can place them.
+        self._overflow = []
+
+        # bucket count must be a power of two
+        self._allocate(1 << (max(1, -(-capacity // slots)) - 1).bit_length())
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._keys[i] is None:
+                out += str(i) + ': None\n'
+            else:
+                out += str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) + '\n'
+        for entry in self._stash:
+            out += 'stash: K: ' + str(entry[0]) + ' V: ' + str(entry[1]) + '\n'
+        for entry in self._overflow:
+            out += 'overflow: K: ' + str(entry[0]) + ' V: ' + str(entry[1]) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_stash_size(self) -> int:
+        """
+        Return the number of entries waiting in the stash
+        """
+        return len(self._stash)
+
+    def get_overflow_size(self) -> int:
+        """
+        Return the number of entries kept in the overflow
+        """
+        return len(self._overflow)
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, buckets: int) -> None:
+        """
+        Replace the storage arrays with empty arrays holding the given number of buckets, and pick new random odd
+        multipliers and offsets for both buckets.
+        """
+        capacity = buckets * self._slots
+        self._buckets = buckets
+        self._capacity = capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        # cached results of both hash functions, so entries can be moved and rehashed without hashing their keys
+        self._hashes_1 = array('Q', [0]) * capacity
+        self._hashes_2 = array('Q', [0]) * capacity
+
+        # A bucket is the top bits of hash_1 * a + hash_2 * b + c for random odd multipliers a and b and a random
+        # offset c (multiply-add-shift hashing of the pair). Using both hashes for both buckets separates keys that
+        # only collide under one hash function, and each new set of multipliers gives every key a new pair of buckets,
+        # which is what lets a rehash break up a cycle of evictions. The offset moves even the pair (0, 0).
+        self._shift = 64 - (buckets.bit_length() - 1)
+        self._multipliers = [self._random.getrandbits(64) | 1 for _ in range(4)]
+        self._offsets = [self._random.getrandbits(64) for _ in range(2)]
+
+    def _bucket_1(self, hash_1: int, hash_2: int) -> int:
+        """
+        Return the index of the first slot of a key's first bucket.
+        """
+        multipliers = self._multipliers
+        return (((hash_1 * multipliers[0] + hash_2 * multipliers[1] + self._offsets[0]) & HASH_MASK)
+                >> self._shift) * self._slots
+
+    def _bucket_2(self, hash_1: int, hash_2: int) -> int:
+        """
+        Return the index of the first slot of a key's second bucket.
+        """
+        multipliers = self._multipliers
+        return (((hash_1 * multipliers[2] + hash_2 * multipliers[3] + self._offsets[1]) & HASH_MASK)
+                >> self._shift) * self._slots
+
+    def _hash(self, key: str) -> (int, int):
+        """
+        Return the results of both hash functions for the key, reduced to unsigned 64 bit integers.
+        """
+        return self._function_1(key) & HASH_MASK, self._function_2(key) & HASH_MASK
+
+    def _find(self, key: str, hash_1: int, hash_2: int) -> int:
+        """
+        Look for the given key in its two buckets. Returns its slot index, or -1 if it is not in the table (it may
+        still be in the stash or the overflow, see _find_spilled).
+        """
+        keys = self._keys
+        hashes_1 = self._hashes_1
+        start = self._bucket_1(hash_1, hash_2)
+        index = start
+        while index < start + self._slots:
+            if hashes_1[index] == hash_1 and keys[index] == key:
+                return index
+            index += 1
+
+        start = self._bucket_2(hash_1, hash_2)
+        index = start
+        while index < start + self._slots:
+            if hashes_1[index] == hash_1 and keys[index] == key:
+                return index
+            index += 1
+        return -1
+
+    def _find_spilled(self, key: str, hash_1: int, hash_2: int) -> (list, int):
+        """
+        Look for the given key among the entries kept outside the table. Returns a tuple of the list holding its
+        [key, value, hash_1, hash_2] entry (the stash or the overflow) and its position in that list, or (None, -1) if
+        it is not in the map. Both lists are bounded, so this takes at most stash_size + overflow_size comparisons.
+        """
+        for entries in (self._stash, self._overflow):
+            position = 0
+            while position < len(entries):
+                entry = entries[position]
+                if entry[2] == hash_1 and entry[3] == hash_2 and entry[0] == key:
+                    return entries, position
+                position += 1
+        return None, -1
+
+    def _store(self, index: int, key: str, value: object, hash_1: int, hash_2: int) -> None:
+        """
+        Write an entry into the given slot.
+        """
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes_1[index] = hash_1
+        self._hashes_2[index] = hash_2
+
+    def _free_slot(self, start: int) -> int:
+        """
+        Return the index of an empty slot in the bucket starting at the given index, or -1 if the bucket is full.
+        """
+        index = start
+        while index < start + self._slots:
+            if self._keys[index] is None:
+                return index
+            index += 1
+        return -1
+
+    def _place(self, key: str, value: object, hash_1: int, hash_2: int) -> list:
+        """
+        Put an entry that is not in the table into one of its buckets. If both are full, a random entry of the bucket
+        is evicted to its other bucket, and so on for up to MAX_EVICTIONS steps. Returns None once everything has
+        found a slot, otherwise the [key, value, hash_1, hash_2] entry left over at the end of the chain.
+        """
+        start_1 = self._bucket_1(hash_1, hash_2)
+        index = self._free_slot(start_1)
+        if index == -1:
+            index = self._free_slot(self._bucket_2(hash_1, hash_2))
+        if index != -1:
+            self._store(index, key, value, hash_1, hash_2)
+            return None
+
+        start = start_1
+        evictions = 0
+        while evictions < MAX_EVICTIONS:
+            # swap the entry being placed with a random one from the full bucket
+            index = start + self._random.randrange(self._slots) if self._slots > 1 else start
+            evicted = (self._keys[index], self._values[index], self._hashes_1[index], self._hashes_2[index])
+            self._store(index, key, value, hash_1, hash_2)
+            key, value, hash_1, hash_2 = evicted
+
+            # move the evicted entry to whichever of its buckets it was not just taken out of
+            start = self._bucket_1(hash_1, hash_2)
+            if start == index - index % self._slots:
+                start = self._bucket_2(hash_1, hash_2)
+            index = self._free_slot(start)
+            if index != -1:
+                self._store(index, key, value, hash_1, hash_2)
+                return None
+            evictions += 1
+
+        return [key, value, hash_1, hash_2]
+
+    def _pair_count(self, hash_1: int, hash_2: int) -> int:
+        """
+        Return the number of entries with the given pair of hashes in its two buckets and the stash, which are the
+        only places outside the overflow such an entry can be.
+        """
+        start_1 = self._bucket_1(hash_1, hash_2)
+        start_2 = self._bucket_2(hash_1, hash_2)
+        count = 0
+        for start in ((start_1,) if start_1 == start_2 else (start_1, start_2)):
+            index = start
+            while index < start + self._slots:
+                if self._keys[index] is not None and self._hashes_1[index] == hash_1 and \
+                        self._hashes_2[index] == hash_2:
+                    count += 1
+                index += 1
+        for entry in self._stash:
+            if entry[2] == hash_1 and entry[3] == hash_2:
+                count += 1
+        return count
+
+    def _take_overflow(self, hash_1: int, hash_2: int) -> list:
+        """
+        Remove and return an overflow entry with the given pair of hashes, or None if there is none. Called when an
+        entry with that pair leaves the table or the stash, so that the overflow only holds keys that do not fit.
+        """
+        position = 0
+        while position < len(self._overflow):
+            entry = self._overflow[position]
+            if entry[2] == hash_1 and entry[3] == hash_2:
+                return self._overflow.pop(position)
+            position += 1
+        return None
+
+    def _rehash(self, buckets: int, extra: list = None) -> None:
+        """
+        Move every entry (from the table, the stash and the optional extra entry) into freshly allocated arrays with
+        the given number of buckets and new multipliers. If more entries are left over than fit in the stash, it tries
+        again with new multipliers, doubling the table every REHASHES_PER_GROWTH attempts while that can still help,
+        and after MAX_REHASH_ATTEMPTS in any case. No pair of hashes has more entries outside the overflow than its
+        two buckets hold, so some choice of multipliers and size always places them, and the stash never grows past
+        its size. The overflow is left as it is.
+        """
+        entries = list(self._stash)
+        index = 0
+        while index < self._capacity:
+            if self._keys[index] is not None:
+                entries.append([self._keys[index], self._values[index], self._hashes_1[index], self._hashes_2[index]])
+            index += 1
+        if extra is not None:
+            entries.append(extra)
+
+        attempts = 0
+        while True:
+            self._allocate(buckets)
+            leftovers = []
+            for key, value, hash_1, hash_2 in entries:
+                leftover = self._place(key, value, hash_1, hash_2)
+                if leftover is not None:
+                    leftovers.append(leftover)
+            if len(leftovers) <= self._stash_size:
+                self._stash = leftovers
+                return
+            attempts += 1
+            if attempts % REHASHES_PER_GROWTH == 0 and (attempts >= MAX_REHASH_ATTEMPTS or
+                                                        len(entries) > self._capacity * self._max_load / 2):
+                buckets *= 2
+
+    def _drain_stash(self) -> None:
+        """
+        Move stash entries whose buckets now have an empty slot back into the table.
+        """
+        position = 0
+        while position < len(self._stash):
+            key, value, hash_1, hash_2 = self._stash[position]
+            index = self._free_slot(self._bucket_1(hash_1, hash_2))
+            if index == -1:
+                index = self._free_slot(self._bucket_2(hash_1, hash_2))
+            if index != -1:
+                self._store(index, key, value, hash_1, hash_2)
+                self._stash.pop(position)
+            else:
+                position += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hashmap (or updates if it already exists). The table doubles once the load factor would
+        go over the limit for its number of slots per bucket.
+        A new key whose pair of hashes already has 2 * slots entries in its buckets and the stash goes to the
+        overflow, and ValueError is raised, without changing the map, if the overflow is full.
+        """
+        hash_1, hash_2 = self._hash(key)
+        index = self._find(key, hash_1, hash_2)
+        if index >= 0:
+            self._values[index] = value
+            return
+        entries, position = self._find_spilled(key, hash_1, hash_2)
+        if entries is not None:
+            entries[position][1] = value
+            return
+
+        if self._pair_count(hash_1, hash_2) >= 2 * self._slots:
+            if len(self._overflow) >= self._overflow_size:
+                raise ValueError(f"cannot hold more than {2 * self._slots + self._overflow_size} keys with the "
+                                 f"hashes of {key!r}; the hash functions cannot tell them apart")
+            self._overflow.append([key, value, hash_1, hash_2])
+            self._size += 1
+            return
+
+        if self._size + 1 > self._capacity * self._max_load:
+            self._rehash(self._buckets * 2)
+
+        leftover = self._place(key, value, hash_1, hash_2)
+        self._size += 1
+        if leftover is not None:
+            if len(self._stash) < self._stash_size:
+                self._stash.append(leftover)
+            else:
+                # The eviction chain probably ran into a cycle: pick new buckets for every key
+                self._rehash(self._buckets, leftover)
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+        Load factor = total number of elements stored in the table / number of buckets
+        𝝺 = n / m
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of empty slots in the hash table.
+        """
+        return self._capacity - self._size + len(self._stash) + len(self._overflow)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the capacity of the internal hash table. All existing key/value pairs will be copied over into their new
+        hash map location, with new multipliers.
+        The number of buckets is rounded up to a power of two, and keeps doubling until the table load is within the
+        limit for its number of slots per bucket.
+        """
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+        buckets = 1 << (-(-new_capacity // self._slots) - 1).bit_length()
+        while self._size > buckets * self._slots * self._max_load:
+            buckets *= 2
+
+        self._rehash(buckets)
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        hash_1, hash_2 = self._hash(key)
+        index = self._find(key, hash_1, hash_2)
+        if index >= 0:
+            return self._values[index]
+        entries, position = self._find_spilled(key, hash_1, hash_2)
+        if entries is not None:
+            return entries[position][1]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False. An
+        empty hash map does not contain any keys.
+        """
+        hash_1, hash_2 = self._hash(key)
+        return self._find(key, hash_1, hash_2) != -1 or self._find_spilled(key, hash_1, hash_2)[0] is not None
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        hash_1, hash_2 = self._hash(key)
+        index = self._find(key, hash_1, hash_2)
+        if index >= 0:
+            self._store(index, None, None, 0, 0)
+            # the freed slot is in one of the buckets of the pair, so an overflow entry with that pair can take it
+            entry = self._take_overflow(hash_1, hash_2) if self._overflow else None
+            if entry is not None:
+                self._store(index, *entry)
+            elif self._stash:
+                self._drain_stash()
+        else:
+            entries, position = self._find_spilled(key, hash_1, hash_2)
+            if entries is None:
+                return
+            entry = self._take_overflow(hash_1, hash_2) if entries is self._stash and self._overflow else None
+            if entry is not None:
+                entries[position] = entry
+            else:
+                entries.pop(position)
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the hash map. It does not change the underlying hash
+        table capacity.
+        """
+        self._allocate(self._buckets)
+        self._stash = []
+        self._overflow = []
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array where each index contains a tuple of a key / value pair
+        stored in the hash map.
+        """
+        out_da = DynamicArray()
+
+        index = 0
+        while index < self._capacity:
+            if self._keys[index] is not None:
+                out_da.append((self._keys[index], self._values[index]))
+            index += 1
+        for entry in self._stash:
+            out_da.append((entry[0], entry[1]))
+        for entry in self._overflow:
+            out_da.append((entry[0], entry[1]))
+        return out_da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCapacity rounding example")
+    print("-------------------------")
+    m = HashMap(23)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+
+    print("\nResize load example")
+    print("-------------------")
+    m = HashMap(79, slots=4)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > MAX_LOAD[4]:
+            print(f"Check that the load factor is acceptable after the call to resize_table().\n"
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to {MAX_LOAD[4]}")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2), m.get_stash_size())
+
+    print("\nStash and rehash example")
+    print("------------------------")
+    # with one slot per bucket, three keys whose two buckets are the same pair of buckets cannot all be placed, so
+    # the third one waits in the stash. Once the stash is full, the next such key makes the table rehash with new
+    # multipliers at the same capacity, which spreads the keys out again.
+    import zlib
+    m = HashMap(64, lambda key: zlib.crc32(key.encode()), lambda key: zlib.crc32(key.encode()[::-1]), slots=1)
+    groups = {}
+    number = 0
+    while sum(1 for keys in groups.values() if len(keys) == 3) < STASH_SIZE + 1:
+        key = 'key' + str(number)
+        hash_1, hash_2 = m._hash(key)
+        buckets = frozenset((m._bucket_1(hash_1, hash_2), m._bucket_2(hash_1, hash_2)))
+        if len(buckets) == 2 and len(groups.setdefault(buckets, [])) < 3:
+            groups[buckets].append(key)
+        number += 1
+    multipliers = m._multipliers
+    stash_sizes = []
+    added = []
+    for keys in [keys for keys in groups.values() if len(keys) == 3][:STASH_SIZE + 1]:
+        for key in keys:
+            m.put(key, key)
+            added.append(key)
+        stash_sizes.append(m.get_stash_size())
+    result = max(stash_sizes) <= STASH_SIZE and m._multipliers is not multipliers and m.get_capacity() == 64
+    result &= all(m.get(key) == key for key in added) and m.get_size() == len(added)
+    print(stash_sizes, m.get_size(), m.get_capacity(), result)
+
+    print("\nOverflow example")
+    print("----------------")
+    # keys with the same pair of hashes can never be split up by new multipliers: once they have filled both of their
+    # buckets, the rest go to the overflow instead of evicting each other, and once that is full put() raises
+    m = HashMap(64, lambda key: 1, lambda key: 2)
+    for i in range(2 * 4 + OVERFLOW_SIZE):
+        m.put('key' + str(i), i)
+    in_table = m.get_size() - m.get_stash_size() - m.get_overflow_size()
+    result = in_table == 8 and m.get_stash_size() == 0 and m.get_overflow_size() == OVERFLOW_SIZE
+    result &= all(m.get('key' + str(i)) == i for i in range(24))
+    print(m.get_size(), in_table, m.get_overflow_size(), result)
+    try:
+        m.put('key24', 24)
+        result = False
+    except ValueError as error:
+        print(error)
+        result = m.get_size() == 24 and not m.contains_key('key24')
+    # updating a key in the overflow still works when it is full
+    m.put('key23', 'updated')
+    result &= m.get('key23') == 'updated' and m.get_size() == 24
+    print(m.get_size(), m.get_overflow_size(), result)
+    # removing a key from the table lets an overflow entry with the same pair take its slot, which frees room for
+    # another key in the overflow
+    table_key = next(key for key in m._keys if key is not None)
+    m.remove(table_key)
+    result = m.get_size() == 23 and m.get_overflow_size() == OVERFLOW_SIZE - 1 and not m.contains_key(table_key)
+    m.put('key24', 24)
+    result &= m.get_size() == 24 and m.get('key24') == 24 and m.get_overflow_size() == OVERFLOW_SIZE
+    print(m.get_size(), m.get_overflow_size(), result)
@@ -0,0 +1,466 @@
+# Description: This file contains code for a persistent HashMap class, implemented using Open Addressing with Quadratic
+# Probing over a memory-mapped file. The file holds a header, an array of fixed-width slots (cached hash plus the
+# offset of the entry's record) and a heap of key/value records, so opening a table only maps the file and the OS pages
+# in just the slots and records that a probe touches.
+
+
+import io
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import (DynamicArray, HASH_FUNCTION_IDS, HASH_MASK, hash_function_1, hash_function_2,
+                        hash_function_id, next_prime)
+
+
+MAGIC = b'HMAPMMAP'
+VERSION = 2
+
+# magic, format version, hash function id, capacity, size, tombstones, end of the used part of the heap, bytes of the
+# heap taken by records that were replaced or removed
+HEADER = struct.Struct('<8sIIQQQQQ')
+
+# cached hash of the key, then the offset of its record in the file. The offset doubles as the slot state: records
+# always live after the slot array, so the offsets below can never be real records.
+SLOT = struct.Struct('<QQ')
+EMPTY = 0
+TOMBSTONE = 1
+
+# length of the UTF-8 key and of the pickled value, followed by the bytes of both
+RECORD = struct.Struct('<II')
+
+# Bytes reserved for the heap when a file is created
+INITIAL_HEAP_SIZE = 4096
+
+# The table is rebuilt to compact its heap once dead records take up more than this fraction of it (and more than
+# INITIAL_HEAP_SIZE bytes)
+DEAD_HEAP_LOAD = 0.5
+
+
+class HashMap:
+    def __init__(self, path: str, capacity: int = 11, function: callable = None, readonly: bool = False) -> None:
+        """
+        Open the table stored at path, or create it with the given capacity and hash function if the file does not
+        exist. An existing table keeps the capacity and hash function recorded in its file (function, if given, must
+        match). With readonly=True the file is mapped read only, so many processes can share its page cache; put,
+        remove, clear and resize_table then raise io.UnsupportedOperation.
+        Only hash_function_1 and hash_function_2 can be used, since the file records which one built the table.
+        """
+        self._path = path
+        self._readonly = readonly
+        if not os.path.exists(path):
+            self._create(path, next_prime(capacity), function or hash_function_1)
+        self._open()
+
+        if function is not None and function is not self._hash_function:
+            self.close()
+            raise ValueError(f"{path} was built with a different hash function")
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            hash_value, offset = self._slot(i)
+            if offset == EMPTY:
+                out += str(i) + ': None\n'
+            elif offset == TOMBSTONE:
+                out += str(i) + ': TS\n'
+            else:
+                key, value = self._read_record(offset)
+                out += str(i) + ': K: ' + str(key) + ' V: ' + str(value) + '\n'
+        return out
+
+    def __enter__(self) -> "HashMap":
+        """Support use as a context manager, closing the file on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the file when leaving the with block."""
+        self.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _create(path: str, capacity: int, function) -> None:
+        """
+        Write a new, empty table file with the given capacity.
+        """
+        heap_start = HEADER.size + capacity * SLOT.size
+        with open(path, 'wb') as file:
+            file.truncate(heap_start + INITIAL_HEAP_SIZE)
+            file.write(HEADER.pack(MAGIC, VERSION, hash_function_id(function), capacity, 0, 0, heap_start, 0))
+
+    def _open(self) -> None:
+        """
+        Map the table file and read its header.
+        """
+        self._file = open(self._path, 'rb' if self._readonly else 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ if self._readonly else mmap.ACCESS_WRITE)
+
+        magic, version, function_id, capacity, size, tombstones, heap_end, dead_bytes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self._path} is not a version {VERSION} memory-mapped hash table")
+        self._hash_function = HASH_FUNCTION_IDS[function_id]
+        self._capacity = capacity
+        self._size = size
+        self._tombstones = tombstones
+        self._heap_end = heap_end
+        self._dead_bytes = dead_bytes
+
+    def _write_header(self) -> None:
+        """
+        Store the current counters in the file header.
+        """
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, hash_function_id(self._hash_function), self._capacity,
+                         self._size, self._tombstones, self._heap_end, self._dead_bytes)
+
+    def _slot(self, index: int) -> (int, int):
+        """
+        Return the (hash, record offset) stored in the slot at index.
+        """
+        return SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)
+
+    def _set_slot(self, index: int, hash_value: int, offset: int) -> None:
+        """
+        Store a (hash, record offset) pair in the slot at index.
+        """
+        SLOT.pack_into(self._map, HEADER.size + index * SLOT.size, hash_value, offset)
+
+    def _read_key(self, offset: int) -> bytes:
+        """
+        Return the UTF-8 bytes of the key of the record at offset.
+        """
+        key_length, value_length = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        return self._map[start:start + key_length]
+
+    def _record_size(self, offset: int) -> int:
+        """
+        Return the number of heap bytes taken by the record at offset.
+        """
+        key_length, value_length = RECORD.unpack_from(self._map, offset)
+        return RECORD.size + key_length + value_length
+
+    def _read_record(self, offset: int) -> (str, object):
+        """
+        Return the key and value of the record at offset.
+        """
+        key_length, value_length = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        key = self._map[start:start + key_length].decode('utf-8')
+        value = pickle.loads(self._map[start + key_length:start + key_length + value_length])
+        return key, value
+
+    def _append_record(self, key_bytes: bytes, value_bytes: bytes) -> int:
+        """
+        Append a record to the heap, growing the file if needed, and return its offset.
+        """
+        offset = self._heap_end
+        end = offset + RECORD.size + len(key_bytes) + len(value_bytes)
+        if end > len(self._map):
+            self._map.close()
+            self._file.truncate(max(end, 2 * end - HEADER.size))
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+        RECORD.pack_into(self._map, offset, len(key_bytes), len(value_bytes))
+        self._map[offset + RECORD.size:end] = key_bytes + value_bytes
+        self._heap_end = end
+        return offset
+
+    def _check_writable(self) -> None:
+        """
+        Raise io.UnsupportedOperation if the table was opened with readonly=True.
+        """
+        if self._readonly:
+            raise io.UnsupportedOperation(f"{self._path} is open read only")
+
+    def _compact_if_needed(self) -> None:
+        """
+        Rebuild the table at the same capacity if dead records take up too much of the heap.
+        """
+        heap_used = self._heap_end - HEADER.size - self._capacity * SLOT.size
+        if self._dead_bytes > INITIAL_HEAP_SIZE and self._dead_bytes > DEAD_HEAP_LOAD * heap_used:
+            self._rebuild(self._capacity)
+
+    def _find(self, key_bytes: bytes, hash_value: int) -> (int, bool):
+        """
+        Probe the slots once for the key. Returns a tuple of (index, found): the key's slot when it is stored,
+        otherwise the slot it should be inserted into (the first tombstone along the probe sequence, else the empty
+        slot that ended it), or -1 if the sequence has no free slot at all.
+        """
+        capacity = self._capacity
+        initial = hash_value % capacity
+        index = initial
+        tombstone_index = -1
+
+        j = 0
+        while j < capacity:
+            stored_hash, offset = self._slot(index)
+            if offset == EMPTY:
+                return (index if tombstone_index == -1 else tombstone_index), False
+            if offset == TOMBSTONE:
+                if tombstone_index == -1:
+                    tombstone_index = index
+            elif stored_hash == hash_value and self._read_key(offset) == key_bytes:
+                return index, True
+            j += 1
+            index = (initial + j * j) % capacity
+        return tombstone_index, False
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash of the key, reduced so that it fits in a slot.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hashmap (or updates if it already exists). The value is pickled into the file's heap. The
+        table is resized if the load factor is >= 0.50, and rebuilt at the same capacity when tombstones push the
+        occupied slots over that threshold, or when replaced and removed records fill too much of the heap.
+        An update overwrites the old record in place when the new one fits.
+        """
+        self._check_writable()
+        if self.table_load() >= 0.50:
+            self.resize_table(self._capacity * 2)
+        elif (self._size + self._tombstones) / self._capacity >= 0.50:
+            self._rebuild(self._capacity)
+
+        key_bytes = key.encode('utf-8')
+        hash_value = self._hash(key)
+        index, found = self._find(key_bytes, hash_value)
+        if index == -1:
+            self._rebuild(next_prime(self._capacity * 2))
+            index, found = self._find(key_bytes, hash_value)
+
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if found:
+            offset = self._slot(index)[1]
+            old_size = self._record_size(offset)
+            new_size = RECORD.size + len(key_bytes) + len(value_bytes)
+            if new_size <= old_size:
+                # Overwrite in place; only the unused tail of the old record becomes dead space
+                RECORD.pack_into(self._map, offset, len(key_bytes), len(value_bytes))
+                start = offset + RECORD.size + len(key_bytes)
+                self._map[start:start + len(value_bytes)] = value_bytes
+                self._dead_bytes += old_size - new_size
+            else:
+                self._dead_bytes += old_size
+                self._set_slot(index, hash_value, self._append_record(key_bytes, value_bytes))
+        else:
+            if self._slot(index)[1] == TOMBSTONE:
+                self._tombstones -= 1
+            self._size += 1
+            self._set_slot(index, hash_value, self._append_record(key_bytes, value_bytes))
+        self._write_header()
+        self._compact_if_needed()
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+        Load factor = total number of elements stored in the table / number of buckets
+        𝝺 = n / m
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of empty buckets (including tombstones) in the hash table.
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the capacity of the hash table by rebuilding its file. All existing key/value pairs will be copied over
+        into their new slots, and the heap is compacted on the way.
+        Raises io.UnsupportedOperation if the table is open read only.
+        If the new capacity is not a prime number, the next closest prime will be found and used. The capacity keeps
+        doubling until the table load is below 0.50.
+        """
+        self._check_writable()
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+        new_capacity = next_prime(new_capacity)
+        while self._size / new_capacity >= 0.50:
+            new_capacity = next_prime(new_capacity * 2)
+
+        self._rebuild(new_capacity)
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """
+        Write every live record into a new file of the given (prime) capacity, then atomically replace the table file
+        with it. Records are copied as raw bytes with their cached hash, so no key is hashed or unpickled again.
+        """
+        temporary_path = self._path + '.rebuild'
+        self._create(temporary_path, new_capacity, self._hash_function)
+        new_table = HashMap(temporary_path)
+
+        index = 0
+        while index < self._capacity:
+            hash_value, offset = self._slot(index)
+            if offset != EMPTY and offset != TOMBSTONE:
+                key_length, value_length = RECORD.unpack_from(self._map, offset)
+                start = offset + RECORD.size
+                new_offset = new_table._append_record(self._map[start:start + key_length],
+                                                      self._map[start + key_length:start + key_length + value_length])
+
+                # Keys are known to be unique, so the record goes into the first empty slot of its probe sequence
+                initial = hash_value % new_capacity
+                new_index = initial
+                j = 0
+                while new_table._slot(new_index)[1] != EMPTY:
+                    j += 1
+                    new_index = (initial + j * j) % new_capacity
+                new_table._set_slot(new_index, hash_value, new_offset)
+                new_table._size += 1
+            index += 1
+
+        new_table._write_header()
+        new_table.close()
+        self.close()
+        os.replace(temporary_path, self._path)
+        self._open()
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        index, found = self._find(key.encode('utf-8'), self._hash(key))
+        if not found:
+            return None
+        return self._read_record(self._slot(index)[1])[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False. An
+        empty hash map does not contain any keys.
+        """
+        index, found = self._find(key.encode('utf-8'), self._hash(key))
+        return found
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        self._check_writable()
+        index, found = self._find(key.encode('utf-8'), self._hash(key))
+        if not found:
+            return
+
+        # The record stays in the heap as dead space until a rebuild compacts it away
+        self._dead_bytes += self._record_size(self._slot(index)[1])
+        self._set_slot(index, 0, TOMBSTONE)
+        self._size -= 1
+        self._tombstones += 1
+        self._write_header()
+        self._compact_if_needed()
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the hash map. It does not change the underlying hash
+        table capacity.
+        """
+        self._check_writable()
+        heap_start = HEADER.size + self._capacity * SLOT.size
+        self._map[HEADER.size:heap_start] = bytes(heap_start - HEADER.size)
+        self._size = 0
+        self._tombstones = 0
+        self._heap_end = heap_start
+        self._dead_bytes = 0
+        self._write_header()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array where each index contains a tuple of a key / value pair
+        stored in the hash map.
+        """
+        out_da = DynamicArray()
+
+        index = 0
+        while index < self._capacity:
+            offset = self._slot(index)[1]
+            if offset != EMPTY and offset != TOMBSTONE:
+                out_da.append(self._read_record(offset))
+            index += 1
+        return out_da
+
+    def flush(self) -> None:
+        """
+        Write any changes still in memory back to the file.
+        """
+        if not self._readonly:
+            self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flush and unmap the table file. The map cannot be used afterwards.
+        """
+        if self._map.closed:
+            return
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nPersistent put / get example")
+    print("----------------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'example.hmap')
+    with HashMap(path, 79, hash_function_2) as m:
+        keys = [i for i in range(1, 1000, 13)]
+        for key in keys:
+            m.put(str(key), key * 42)
+        m.remove(str(keys[0]))
+        print(m.get_size(), m.get_capacity())
+
+    with HashMap(path, readonly=True) as m:
+        result = True
+        for key in keys[1:]:
+            # all inserted keys must be present
+            result &= m.get(str(key)) == key * 42
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(m.get_size(), m.get_capacity(), result, m.contains_key(str(keys[0])))
+    os.remove(path)
+
+    print("\nHeap compaction example")
+    print("-----------------------")
+    with HashMap(path, 11, hash_function_1) as m:
+        for i in range(20000):
+            m.put('counter', i)
+            m.put('note', 'x' * (i % 50))
+        print(m.get_size(), m.get('counter'), m.get('note') == 'x' * 49, os.path.getsize(path) < 64 * 1024)
+
+    with HashMap(path, readonly=True) as m:
+        for name, operation in (('put', lambda: m.put('counter', 0)), ('remove', lambda: m.remove('counter')),
+                                ('clear', m.clear), ('resize_table', lambda: m.resize_table(100))):
+            try:
+                operation()
+                print(name, 'no error')
+            except io.UnsupportedOperation as error:
+                print(name, 'UnsupportedOperation:', error.args[0].endswith('is open read only'))
+        print(m.get_size(), m.get('counter'))
+    os.remove(path)
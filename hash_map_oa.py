@@ -7,26 +7,86 @@
 # Probing
 
 
-from a6_include import (DynamicArray, HashEntry,
-                        hash_function_1, hash_function_2)
+import time
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, HashMapItemsView, HashMapKeysView, HashMapStats, HashMapValuesView,
+                        MixedHashFunction, batch_hash, hash_function_1, hash_function_2, is_prime, next_prime)
+from hash_map_snapshot import (OPEN_ADDRESSING, read_snapshot, write_snapshot)
+
+
+# Once tombstones take up this fraction of the buckets, put() rehashes the table in place to purge them
+TOMBSTONE_PURGE_LOAD = 0.25
+
+# Collision resolution modes
+QUADRATIC = 'quadratic'
+ROBIN_HOOD = 'robin_hood'
+
+# Default maximum load factor for each mode. Quadratic probing over a prime capacity is only guaranteed to find an empty
+# bucket while the table is at most half full, so it cannot go higher than 0.5.
+DEFAULT_MAX_LOAD = {QUADRATIC: 0.5, ROBIN_HOOD: 0.9}
+
+# Number of old buckets moved by every lookup or update while an incremental resize is in progress. A doubling starts
+# with the new table at most a quarter full and moves every old bucket within capacity / MIGRATION_STEP operations,
+# so any step of 2 or more finishes before the new table can reach a load of 0.5.
+MIGRATION_STEP = 8
+
+# Placeholder left in the old table for each entry moved by an incremental resize. It is a tombstone, so the probe
+# sequences of entries not moved yet still run through it, and sharing one object means freeing the old table at the
+# end of the resize does not have to free a tombstone per entry.
+MOVED = HashEntry(None, None)
+MOVED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, probing: str = QUADRATIC, max_load: float = None,
+                 incremental: bool = False, power_of_two: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        With probing=ROBIN_HOOD, collisions are resolved with linear probing and Robin Hood displacement instead, and
+        removals use backward-shift deletion rather than tombstones. Hashes are always run through mix_hash() in this
+        mode, since linear probing from the raw hash of a weak hash function piles neighbouring keys into long runs.
+        max_load is the load factor at which put() grows the table (defaults to DEFAULT_MAX_LOAD for the mode).
+        With incremental=True, a resize does not copy the table in one go: the old bucket array is kept, and every
+        later lookup or update moves MIGRATION_STEP of its buckets into the new one (see _begin_migration). This is
+        only supported with quadratic probing.
+        With power_of_two=True, the capacity is a power of two instead of a prime. Hashes are run through mix_hash() so
+        that the low bits used as the bucket index depend on the whole hash, and quadratic probing uses triangular
+        numbers (offsets 0, 1, 3, 6, ...), which visit every bucket of a power of two table, so max_load can go up to 1.
         """
+        if probing not in DEFAULT_MAX_LOAD:
+            raise ValueError(f"unknown probing mode {probing!r}")
+        if incremental and probing == ROBIN_HOOD:
+            raise ValueError("incremental resizing is only supported with quadratic probing")
+        if max_load is None:
+            max_load = DEFAULT_MAX_LOAD[probing]
+        if not 0 < max_load <= DEFAULT_MAX_LOAD[QUADRATIC] and \
+                not ((probing == ROBIN_HOOD or power_of_two) and 0 < max_load < 1):
+            raise ValueError(f"max_load {max_load} is out of range for {probing} probing")
+        self._robin_hood = probing == ROBIN_HOOD
+        self._max_load = max_load
+        self._incremental = incremental
+        self._power_of_two = power_of_two
+        # While an incremental resize is in progress: the old bucket array and capacity, and the next old bucket to move
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number (or a power of two in power of two mode)
+        self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        self._hash_function = function
+        self._hash_function = MixedHashFunction(function) if power_of_two or self._robin_hood else function
         self._size = 0
+        self._tombstones = 0
+        # incremented whenever a key is added or removed or the table is rebuilt, so iterators can detect it
+        self._version = 0
+        # HashMapStats collecting probe lengths and resizes, or None while stats are off (see enable_stats)
+        self._stats = None
 
     def __str__(self) -> str:
         """
@@ -71,6 +131,24 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity to use for a table of at least the given size: the next power of two in power of two
+        mode, otherwise the next prime (see next_prime in a6_include).
+        """
+        if self._power_of_two:
+            return 1 << (max(capacity, 1) - 1).bit_length()
+        return next_prime(capacity)
+
+    def _probe_index(self, initial: int, j: int, capacity: int) -> int:
+        """
+        Returns the bucket probed at step j of the probe sequence starting at initial: initial + j * j with prime
+        capacities, initial + j * (j + 1) / 2 masked to the capacity in power of two mode.
+        """
+        if self._power_of_two:
+            return (initial + (j * j + j) // 2) & (capacity - 1)
+        return (initial + j * j) % capacity
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -90,52 +168,124 @@ class HashMap:
     def put(self, key: str, value: object) -> None:
         """
         Adds an item to the hashmap (or updates if it already exists). This method will resize the array if the
-        load facter is >= 0.50.
+        load facter is >= the maximum load (0.50 by default). If the table is not too full but tombstones are, it is
+        rehashed at the same capacity to purge them.
         """
-        # remember, if the load factor is greater than or equal to 0.5,
+        # remember, if the load factor is greater than or equal to the maximum,
         # resize the table before putting the new key/value pair
-        if self.table_load() >= 0.50:
+        self._make_room()
+
+        # Calculate the hash value
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _make_room(self) -> None:
+        """
+        Resizes the table if the load factor is >= the maximum load, or rehashes it at the same capacity if tombstones
+        are making probe sequences too long. Called before anything that may add a new key.
+        """
+        if self.table_load() >= self._max_load:
             old_capacity = self.get_capacity()
             new_capacity = old_capacity * 2
             self.resize_table(new_capacity)
+        elif self.effective_load() >= self._max_load or self._tombstones / self._capacity >= TOMBSTONE_PURGE_LOAD:
+            self._rehash(self._capacity)
 
-        # Calculate the hash value
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Adds an item whose hash has already been calculated, without checking the table load.
+        """
+        index, found = self._find(key, hash_value, 'put')
+        if found:
+            # Update the value if it already exists
+            self._buckets[index].value = value
+        else:
+            self._insert_new(index, key, value, hash_value)
 
-        # Insert the entry if the first index to find is empty
-        if self._buckets[index] is None:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
-            return
+    def _find(self, key: str, hash_value: int, operation: str = None) -> (int, bool):
+        """
+        Probes the table once for the key. Returns a tuple of (index, found): when the key is stored, index is its
+        bucket. Otherwise index is where the key belongs: for quadratic probing the first tombstone along the probe
+        sequence (the key is only known to be missing once an empty bucket is reached), else the empty bucket that
+        ended it, or -1 if the sequence has no free bucket at all. For Robin Hood probing it is the bucket where the
+        probe stopped, which is where the key has to be placed.
+        While stats are on, the probe is counted under the name of the calling operation, if one is given, including
+        the buckets examined in the old table during an incremental resize.
+        """
+        old_length = 0
+        if self._old_buckets is not None:
+            old_length = self._advance_migration(key, hash_value)
+
+        capacity = self._capacity
+        initial = hash_value % capacity
+        index = initial
+
+        if self._robin_hood:
+            # The probe stops early at the first entry that is closer to its home bucket than the key would be
+            distance = 0
+            while True:
+                curr_item = self._buckets[index]
+                if curr_item is None or (index - curr_item.hash_value) % capacity < distance:
+                    found = False
+                    break
+                if curr_item.hash_value == hash_value and curr_item.key == key:
+                    found = True
+                    break
+                index = (index + 1) % capacity
+                distance += 1
+            length = distance + 1
         else:
-            if self._buckets[index].is_tombstone is True:
-                self._buckets[index] = HashEntry(key, value)
-                self._size += 1
+            # Quadratic probe until the key or an empty bucket is found; every index has been visited after capacity
+            # steps. In power of two mode each step moves j buckets further (triangular probing) and the index is
+            # masked.
+            triangular = self._power_of_two
+            mask = capacity - 1
+            tombstone_index = -1
+            found = False
+            j = 0
+            while j < capacity:
+                curr_item = self._buckets[index]
+                if curr_item is None:
+                    if tombstone_index != -1:
+                        index = tombstone_index
+                    break
+                if curr_item.is_tombstone is True:
+                    # Remember the first tombstone, but keep probing in case the key exists further along
+                    if tombstone_index == -1:
+                        tombstone_index = index
+                # Compare the cached hashes before the keys
+                elif curr_item.hash_value == hash_value and curr_item.key == key:
+                    found = True
+                    break
+                j += 1
+                index = (index + j) & mask if triangular else (initial + j * j) % capacity
             else:
-                # Probe for the next open spot
-                j = 0
-                placed = False
-                initial = index
-                while placed is False:
-                    if self._buckets[index] is None:
-                        self._buckets[index] = HashEntry(key, value)
-                        self._size += 1
-                        placed = True
-                        return
-                    elif self._buckets[index].is_tombstone is True:
-                        self._buckets[index] = HashEntry(key, value)
-                        self._size += 1
-                        placed = True
-                        return
-                    # Update the value if it already exists
-                    elif self._buckets[index].key == key:
-                        self._buckets[index].value = value
-                        placed = True
-                        return
-                    else:
-                        j += 1
-                    index = (initial + (j ** 2)) % self._capacity
+                index = tombstone_index
+            length = min(j + 1, capacity)
+
+        if self._stats is not None and operation is not None:
+            self._stats.record_probe(operation, found, old_length + length)
+        return index, found
+
+    def _insert_new(self, index: int, key: str, value: object, hash_value: int) -> None:
+        """
+        Stores a key that _find() reported as missing at the index it returned.
+        """
+        if self._robin_hood:
+            self._place_robin_hood(self._buckets, self._capacity, HashEntry(key, value, hash_value), index)
+            self._size += 1
+            self._version += 1
+            return
+
+        if index == -1:
+            # The probe sequence has no free bucket left
+            self._rehash(self._round_capacity(self._capacity * 2))
+            index, found = self._find(key, hash_value)
+
+        if self._buckets[index] is not None:
+            self._tombstones -= 1
+        self._buckets[index] = HashEntry(key, value, hash_value)
+        self._size += 1
+        self._version += 1
 
     def table_load(self) -> float:
         """
@@ -145,6 +295,19 @@ class HashMap:
         """
         return self._size / self._buckets.length()
 
+    def effective_load(self) -> float:
+        """
+        This method returns the fraction of buckets that are not empty, counting tombstones as well as stored
+        elements. Probe sequences only end at an empty bucket, so this is what determines probe lengths.
+        """
+        return (self._size + self._tombstones) / self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """
+        This method returns the number of tombstones currently in the hash table.
+        """
+        return self._tombstones
+
     def empty_buckets(self) -> int:
         """
         This method returns the number of empty buckets (including tombstones) in the hash table.
@@ -155,36 +318,168 @@ class HashMap:
         """
         Resizes the capacity of the internal hash table. All existing key/value pairs will be copied over into their new
         hash map location.
-        If the new capacity is not a prime number, the next closest prime will be found and used.
+        If the new capacity is not a prime number, the next closest prime (or power of two in power of two mode) will
+        be found and used. The capacity keeps
+        doubling until the table load is below the maximum load, so the copy itself never has to resize.
         """
         if new_capacity < 1 or new_capacity < self._size:
             return
-        if self._is_prime(new_capacity) is False:
-            new_capacity = self._next_prime(new_capacity)
+        if self._power_of_two or is_prime(new_capacity) is False:
+            new_capacity = self._round_capacity(new_capacity)
+
+        # Size the new table once, up front
+        while self._size / new_capacity >= self._max_load:
+            new_capacity = self._round_capacity(new_capacity * 2)
+
+        self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Moves every live entry into a new bucket array of the given (prime) capacity. The existing HashEntry objects are
+        reused, tombstones are dropped, and since keys are known to be unique each entry goes straight into the first
+        empty slot of its probe sequence.
+        In incremental mode the entries are moved over the following operations instead (see _begin_migration).
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        old_capacity = self._capacity
+        started = time.perf_counter() if self._stats is not None else 0.0
+        if self._incremental:
+            self._begin_migration(new_capacity)
+        else:
+            self._move_entries(new_capacity)
+        if self._stats is not None:
+            self._stats.record_resize(old_capacity, new_capacity, time.perf_counter() - started)
 
-        # Make a new HashMap
-        new_hash = HashMap(new_capacity, self._hash_function)
+    def _move_entries(self, new_capacity: int) -> None:
+        """
+        Moves every live entry into a new bucket array of the given capacity at once (see _rehash).
+        """
+        new_buckets = [None] * new_capacity
 
         item_index = 0
-        # iterate through the old values, putting them in the new_hash HashMap
         while item_index < self._buckets.length():
-            # If the load factor gets too large, resize the table to double the capacity
-            if new_hash.get_size() / new_hash.get_capacity() >= 0.50:
-                new_hash.resize_table(new_hash.get_capacity() * 2)
-
             curr_item = self._buckets[item_index]
 
-            # Only need to copy non-none, non-tombstone values over
-            if curr_item is not None:
-                if curr_item.is_tombstone is False:
-                    new_hash.put(curr_item.key, curr_item.value)
+            # Only need to move non-none, non-tombstone entries over
+            if curr_item is not None and curr_item.is_tombstone is False and self._robin_hood:
+                self._place_robin_hood(new_buckets, new_capacity, curr_item)
+            elif curr_item is not None and curr_item.is_tombstone is False:
+                initial = curr_item.hash_value % new_capacity
+                index = initial
+                j = 0
+                while new_buckets[index] is not None:
+                    j += 1
+                    index = self._probe_index(initial, j, new_capacity)
+                new_buckets[index] = curr_item
 
             item_index += 1
 
         # Update the HashMap's internally data
-        self._buckets = new_hash._buckets
-        self._capacity = new_hash.get_capacity()
-        self._size = new_hash.get_size()
+        self._buckets = DynamicArray(new_buckets)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
+
+    def _begin_migration(self, new_capacity: int) -> None:
+        """
+        Starts an incremental resize: an empty bucket array of the given (prime) capacity becomes the table, and the
+        current one is kept as the old table until all of its entries have been moved. Every key is in exactly one of
+        the two tables. _find() first moves the key being looked up out of the old table, if it is there, and then
+        moves the next MIGRATION_STEP old buckets, so everything after that only has to look at the new table. Moved
+        entries leave the MOVED tombstone behind, so the probe sequences of entries still in the old table stay intact.
+        """
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
+
+    def _advance_migration(self, key: str, hash_value: int) -> int:
+        """
+        Moves the given key into the new table if it is still in the old one, then moves the next MIGRATION_STEP old
+        buckets. Returns the number of old buckets examined to look for the key. While stats are on, the time taken
+        is added to the resize that started the migration.
+        """
+        started = time.perf_counter() if self._stats is not None else 0.0
+        capacity = self._old_capacity
+        initial = hash_value % capacity
+        index = initial
+        j = 0
+        while j < capacity:
+            curr_item = self._old_buckets[index]
+            if curr_item is None:
+                break
+            if curr_item.is_tombstone is False and curr_item.hash_value == hash_value and curr_item.key == key:
+                self._migrate_bucket(index)
+                break
+            j += 1
+            index = self._probe_index(initial, j, capacity)
+
+        end = min(self._migrate_index + MIGRATION_STEP, capacity)
+        while self._migrate_index < end:
+            self._migrate_bucket(self._migrate_index)
+            self._migrate_index += 1
+        if self._migrate_index == capacity:
+            self._old_buckets = None
+        if self._stats is not None:
+            self._stats.add_resize_time(time.perf_counter() - started)
+        return min(j + 1, capacity)
+
+    def _migrate_bucket(self, old_index: int) -> None:
+        """
+        Moves the live entry (if any) in the given bucket of the old table into the first empty bucket or tombstone of
+        its probe sequence in the new table.
+        """
+        curr_item = self._old_buckets[old_index]
+        if curr_item is None or curr_item.is_tombstone is True:
+            return
+
+        self._old_buckets[old_index] = MOVED
+
+        initial = curr_item.hash_value % self._capacity
+        index = initial
+        j = 0
+        while self._buckets[index] is not None and self._buckets[index].is_tombstone is False:
+            j += 1
+            index = self._probe_index(initial, j, self._capacity)
+        if self._buckets[index] is not None:
+            self._tombstones -= 1
+        self._buckets[index] = curr_item
+
+    def _finish_migration(self) -> None:
+        """
+        Moves every entry still in the old table, completing an incremental resize at once.
+        """
+        started = time.perf_counter() if self._stats is not None else 0.0
+        while self._migrate_index < self._old_capacity:
+            self._migrate_bucket(self._migrate_index)
+            self._migrate_index += 1
+        self._old_buckets = None
+        if self._stats is not None:
+            self._stats.add_resize_time(time.perf_counter() - started)
+
+    @staticmethod
+    def _place_robin_hood(buckets: list, capacity: int, entry: HashEntry, index: int = None) -> None:
+        """
+        Places an entry whose key is known not to be in buckets, using Robin Hood displacement: whenever the entry being
+        placed is further from its home bucket than the entry occupying a bucket, the two swap and the displaced entry
+        carries on probing. Probing starts at index if given (the bucket where a lookup for the key stopped), otherwise
+        at the entry's home bucket.
+        """
+        if index is None:
+            index = entry.hash_value % capacity
+        distance = (index - entry.hash_value) % capacity
+        while buckets[index] is not None:
+            curr_distance = (index - buckets[index].hash_value) % capacity
+            if curr_distance < distance:
+                buckets[index], entry = entry, buckets[index]
+                distance = curr_distance
+            index = (index + 1) % capacity
+            distance += 1
+        buckets[index] = entry
 
     def get(self, key: str) -> object:
         """
@@ -192,58 +487,106 @@ class HashMap:
         map, the method returns None.
         """
         # Calculate the hash value
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
-
-        if self._buckets[index] is None:
-            return None
-
-        j = 1
-        found = False
-        initial = index
-        while found is False:
-            if self._buckets[index] is None:
-                return None
-            if self._buckets[index].is_tombstone is False:
-                if self._buckets[index].key == key:
-                    return self._buckets[index].value
-            index = (initial + (j ** 2)) % self._capacity
-            j += 1
+        return self._get_hashed(key, self._hash_function(key))
+
+    def _get_hashed(self, key: str, hash_value: int) -> object:
+        """
+        Returns the value for a key whose hash has already been calculated, or None if it is not stored.
+        """
+        index, found = self._find(key, hash_value, 'get')
+        if found:
+            return self._buckets[index].value
+        return None
 
     def contains_key(self, key: str) -> bool:
         """
         This method returns True if the given key is in the hash map, otherwise it returns False. An
         empty hash map does not contain any keys.
         """
-        if self.get(key) is None:
-            return False
-        return True
+        index, found = self._find(key, self._hash_function(key), 'contains')
+        return found
+
+    def _find_entry(self, key: str) -> HashEntry:
+        """
+        Returns the HashEntry of the given key, or None if the key is not in the hash map, with a single probe.
+        """
+        index, found = self._find(key, self._hash_function(key), 'contains')
+        return self._buckets[index] if found else None
 
     def remove(self, key: str) -> None:
         """
         This method removes the given key and its associated value from the hash map. If the key
         is not in the hash map, the method does nothing (no exception needs to be raised).
         """
-        if self.contains_key(key) is False:
+        # Calculate the hash value
+        self._remove_hashed(key, self._hash_function(key))
+
+    def _remove_hashed(self, key: str, hash_value: int) -> None:
+        """
+        Removes a key whose hash has already been calculated.
+        """
+        index, found = self._find(key, hash_value, 'remove')
+        if found:
+            self._remove_at(index)
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Removes the entry stored at the given index. With quadratic probing it is turned into a tombstone. With Robin
+        Hood probing it is removed by backward-shift deletion: every following entry that is not in its home bucket
+        moves back one bucket, so no tombstone is needed.
+        """
+        self._size -= 1
+        self._version += 1
+        if not self._robin_hood:
+            self._buckets[index].is_tombstone = True
+            self._tombstones += 1
             return
 
-        # Find and remove the item
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        next_item = self._buckets[next_index]
+        while next_item is not None and next_item.hash_value % capacity != next_index:
+            self._buckets[index] = next_item
+            index = next_index
+            next_index = (index + 1) % capacity
+            next_item = self._buckets[next_index]
 
-        # Quadratic probe until we find the value
-        j = 0
-        found = False
-        initial = index
-        while found is False:
-            if self._buckets[index].key == key:
-                self._buckets[index].is_tombstone = True
-                self._size -= 1
-                found = True
-            else:
-                j += 1
-            index = (initial + (j ** 2)) % self._capacity
+        self._buckets[index] = None
 
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        This method removes the given key from the hash map and returns its value. If the key is not in the hash map,
+        default is returned instead.
+        """
+        index, found = self._find(key, self._hash_function(key), 'pop')
+        if not found:
+            return default
+        value = self._buckets[index].value
+        self._remove_at(index)
+        return value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, it is added with the
+        value default, which is then returned.
+        """
+        return self.get_or_insert(key, lambda: default)
+
+    def get_or_insert(self, key: str, factory: callable) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, factory() is called to
+        create its value, which is added to the hash map and returned.
+        """
+        self._make_room()
+
+        hash_value = self._hash_function(key)
+        index, found = self._find(key, hash_value, 'get_or_insert')
+        if found:
+            return self._buckets[index].value
+
+        value = factory()
+        self._insert_new(index, key, value, hash_value)
+        return value
 
     def clear(self) -> None:
         """
@@ -252,16 +595,20 @@ class HashMap:
         """
         index = 0
         while index < self._buckets.length():
-            if self._buckets[index] is not None:
-                self._size -= 1
             self._buckets[index] = None
             index += 1
+        self._old_buckets = None
+        self._size = 0
+        self._tombstones = 0
+        self._version += 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         This method returns a dynamic array where each index contains a tuple of a key / value pair
         stored in the hash map.
         """
+        if self._old_buckets is not None:
+            self._finish_migration()
         out_da = DynamicArray()
 
         index = 0
@@ -275,6 +622,195 @@ class HashMap:
             index += 1
         return out_da
 
+    def enable_stats(self) -> None:
+        """
+        This method starts collecting probe length and resize statistics, reported by get_stats(). Every lookup
+        (get, put, contains, remove, pop and get_or_insert) counts the buckets its single probe examined, and every
+        resize its duration, including the steps of an incremental resize. With stats off, this costs one check per
+        operation.
+        """
+        if self._stats is None:
+            self._stats = HashMapStats()
+
+    def disable_stats(self) -> None:
+        """
+        This method stops collecting statistics and discards the collected counters.
+        """
+        self._stats = None
+
+    def get_stats(self) -> dict:
+        """
+        This method returns a dictionary of statistics (see HashMapStats.report): the probe length histograms and
+        resizes collected since enable_stats() (empty if stats are off), the occupancy of each entry's home bucket,
+        and the current size, capacity, load factor and tombstone count.
+        """
+        home_counts = [0] * self._capacity
+        for entry in self._iter_entries():
+            home_counts[entry.hash_value % self._capacity] += 1
+        stats = self._stats if self._stats is not None else HashMapStats()
+        return stats.report(home_counts, size=self._size, capacity=self._capacity, table_load=self.table_load(),
+                            tombstones=self._tombstones)
+
+    def keys(self) -> HashMapKeysView:
+        """
+        This method returns a live view of the keys in the hash map, which streams them without copying.
+        """
+        return HashMapKeysView(self)
+
+    def values(self) -> HashMapValuesView:
+        """
+        This method returns a live view of the values in the hash map, which streams them without copying.
+        """
+        return HashMapValuesView(self)
+
+    def items(self) -> HashMapItemsView:
+        """
+        This method returns a live view of the (key, value) pairs in the hash map, which streams them without copying.
+        """
+        return HashMapItemsView(self)
+
+    def __iter__(self):
+        """
+        Iterate over the keys of the hash map.
+        """
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        """
+        Return the number of elements in the hash map.
+        """
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map, supporting the in operator.
+        """
+        return self.contains_key(key)
+
+    def _iter_entries(self):
+        """
+        Yield every live HashEntry straight from the buckets. Raises RuntimeError if the hash map has keys added or
+        removed, or is resized, while the iteration is in progress. An incremental resize in progress is finished first,
+        since lookups made during the iteration would otherwise move entries between the tables.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        version = self._version
+        index = 0
+        while index < self._capacity:
+            curr_item = self._buckets[index]
+            if curr_item is not None and curr_item.is_tombstone is False:
+                yield curr_item
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+            index += 1
+
+    def save(self, path: str) -> None:
+        """
+        This method writes the hash map to a binary snapshot file (see hash_map_snapshot), including every entry's
+        bucket and cached hash and the position of every tombstone. Only maps using hash_function_1 or
+        hash_function_2 can be saved.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        buckets, hashes, keys, values, tombstones = array('Q'), array('Q'), [], [], array('Q')
+
+        index = 0
+        while index < self._capacity:
+            curr_item = self._buckets[index]
+            if curr_item is not None and curr_item.is_tombstone is True:
+                tombstones.append(index)
+            elif curr_item is not None:
+                buckets.append(index)
+                hashes.append(curr_item.hash_value)
+                keys.append(curr_item.key)
+                values.append(curr_item.value)
+            index += 1
+
+        options = {'probing': ROBIN_HOOD if self._robin_hood else QUADRATIC, 'max_load': self._max_load,
+                   'incremental': self._incremental, 'power_of_two': self._power_of_two}
+        function = self._hash_function
+        if isinstance(function, MixedHashFunction):
+            function = function.function
+        write_snapshot(path, OPEN_ADDRESSING, function, self._capacity, options,
+                       buckets, hashes, keys, values, tombstones)
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        This method returns a new hash map read from a snapshot file written by save(). Entries and tombstones go
+        straight back into their saved buckets with their saved hashes, without calling put() or the hash function.
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        hash_map = cls(snapshot.capacity, snapshot.function, **snapshot.options)
+
+        new_buckets = [None] * snapshot.capacity
+        position = 0
+        while position < len(snapshot.keys):
+            new_buckets[snapshot.buckets[position]] = HashEntry(snapshot.keys[position], snapshot.values[position],
+                                                                snapshot.hashes[position])
+            position += 1
+        for index in snapshot.tombstones:
+            tombstone = HashEntry(None, None)
+            tombstone.is_tombstone = True
+            new_buckets[index] = tombstone
+
+        hash_map._buckets = DynamicArray(new_buckets)
+        hash_map._size = len(snapshot.keys)
+        hash_map._tombstones = len(snapshot.tombstones)
+        return hash_map
+
+    def put_many(self, pairs, hashes: list = None) -> None:
+        """
+        Adds (or updates) every (key, value) pair in pairs. All keys are hashed in a single batch, and the table is
+        resized at most once, before any pair is added, to fit the case where every key is new.
+        hashes can hold the keys' hashes, already calculated with this map's hash function, to skip hashing.
+        """
+        pairs = list(pairs)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, [pair[0] for pair in pairs])
+
+        needed = self._size + len(pairs)
+        if needed / self._capacity >= self._max_load:
+            self.resize_table(int(needed / self._max_load) + 1)
+        elif (needed + self._tombstones) / self._capacity >= self._max_load:
+            self._rehash(self._capacity)
+
+        index = 0
+        while index < len(pairs):
+            self._put_hashed(pairs[index][0], pairs[index][1], hashes[index])
+            index += 1
+
+    def get_many(self, keys, hashes: list = None) -> DynamicArray:
+        """
+        Returns a dynamic array with the value for each key in keys, in the same order (None for missing keys). All
+        keys are hashed in a single batch, unless their hashes are passed in.
+        """
+        keys = list(keys)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, keys)
+
+        out_da = DynamicArray()
+        index = 0
+        while index < len(keys):
+            out_da.append(self._get_hashed(keys[index], hashes[index]))
+            index += 1
+        return out_da
+
+    def remove_many(self, keys, hashes: list = None) -> None:
+        """
+        Removes every key in keys that is in the hash map. All keys are hashed in a single batch, unless their hashes
+        are passed in.
+        """
+        keys = list(keys)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, keys)
+
+        index = 0
+        while index < len(keys):
+            self._remove_hashed(keys[index], hashes[index])
+            index += 1
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -464,3 +1000,226 @@ if __name__ == "__main__":
     # m.remove('1')
     # m.resize_table(12)
     # print(m.get_keys_and_values())
+
+    print("\nViews example")
+    print("-------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(20):
+        m.put('key' + str(i), i)
+    expected = {'key' + str(i): i for i in range(20)}
+    print(len(m.keys()), sorted(m.values()) == list(range(20)), dict(m.items()) == expected)
+    print('key3' in m.keys(), 'key30' in m.keys(), 3 in m.values(), ('key3', 3) in m.items(), ('key3', 4) in m.items())
+    m.put('key3', None)
+    print(('key3', None) in m.items(), ('key30', None) in m.items())
+    try:
+        for key in m:
+            m.put(key + '!', 0)
+        print('no error')
+    except RuntimeError as error:
+        print('RuntimeError:', error)
+
+    print("\nSingle probe example")
+    print("--------------------")
+    # every operation should hash its key exactly once
+    calls = [0]
+
+    def counting_hash(key: str) -> int:
+        calls[0] += 1
+        return hash_function_1(key)
+
+    m = HashMap(11, counting_hash)
+    m.put('key1', 10)
+    operations = [('put', lambda: m.put('key1', 11)),
+                  ('get', lambda: m.get('key1')),
+                  ('items contains', lambda: ('key1', 11) in m.items()),
+                  ('contains_key', lambda: m.contains_key('key2')),
+                  ('get_or_insert', lambda: m.get_or_insert('key2', int)),
+                  ('pop', lambda: m.pop('key2')),
+                  ('remove', lambda: m.remove('key1')),
+                  ('remove', lambda: m.remove('key9'))]
+    for name, operation in operations:
+        calls[0] = 0
+        operation()
+        print(name, calls[0])
+
+    print("\nBulk operations example")
+    print("-----------------------")
+    m = HashMap(11, hash_function_1)
+    pairs = [('key' + str(i), i) for i in range(200)] + [('key7', 'seven')]
+    m.put_many(pairs)
+    values = m.get_many(['key' + str(i) for i in range(202)])
+    result = values[7] == 'seven' and values[200] is None and values[201] is None
+    result &= all(values[i] == m.get('key' + str(i)) == i for i in range(200) if i != 7)
+    print(m.get_size(), m.get_capacity(), result)
+    m.remove_many(['key' + str(i) for i in range(0, 202, 2)])
+    result = all(m.contains_key('key' + str(i)) == (i % 2 == 1) for i in range(200))
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\nTombstone purge example")
+    print("-----------------------")
+    m = HashMap(101, hash_function_2)
+    for i in range(40):
+        m.put('key' + str(i), i)
+    for i in range(30):
+        m.remove('key' + str(i))
+    buckets = [m._buckets[i] for i in range(m.get_capacity())]
+    counted = sum(1 for bucket in buckets if bucket is not None and bucket.is_tombstone)
+    print(m.get_size(), m.get_tombstone_count(), counted, round(m.effective_load(), 2), m.get_capacity())
+    # tombstones now fill more than TOMBSTONE_PURGE_LOAD of the table, so the next put rehashes at the same capacity
+    m.put('key40', 40)
+    result = all(m.get('key' + str(i)) == i for i in range(30, 41))
+    result &= not any(m.contains_key('key' + str(i)) for i in range(30))
+    print(m.get_size(), m.get_tombstone_count(), round(m.effective_load(), 2), m.get_capacity(), result)
+
+    print("\nRobin Hood example")
+    print("------------------")
+    # hash_function_2 gives many of these keys nearby hashes, so Robin Hood mode mixes the hashes before probing, and
+    # the longest probe stays short in both capacity modes. Keys whose hashes are equal can still only be told apart
+    # one probe at a time, and up to 13 of these keys share a hash_function_2 value, which the bound allows for.
+    probe_bound = 64
+    import random
+    rng = random.Random(0)
+    keys = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(8)) for _ in range(900)]
+    for power_of_two in (False, True):
+        m = HashMap(1024, hash_function_2, ROBIN_HOOD, max_load=0.9, power_of_two=power_of_two)
+        for key in keys:
+            m.put(key, key.upper())
+        m.enable_stats()
+        result = True
+        for key in keys:
+            result &= m.get(key) == key.upper()
+        longest = max(m.get_stats()['probe_lengths']['get hit'])
+        result &= longest <= probe_bound
+        print(power_of_two, m.get_size(), m.get_capacity(), round(m.table_load(), 2), result, 'max probe', longest)
+
+        # backward-shift deletion must leave every remaining key reachable and every removed one missing
+        for key in keys[::2]:
+            m.remove(key)
+        m.disable_stats()
+        m.enable_stats()
+        for key in keys[1::2]:
+            result &= m.get(key) == key.upper()
+        for key in keys[::2]:
+            result &= not m.contains_key(key)
+        longest = max(m.get_stats()['probe_lengths']['get hit'])
+        result &= longest <= probe_bound
+        print(power_of_two, m.get_size(), m.get_capacity(), round(m.table_load(), 2), result, 'max probe', longest)
+
+    print("\nSnapshot example")
+    print("----------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    for options in ({}, {'probing': ROBIN_HOOD, 'max_load': 0.9}, {'power_of_two': True}):
+        m = HashMap(53, hash_function_1, **options)
+        for i in range(40):
+            m.put('key' + str(i), [i])
+        for i in range(0, 40, 3):
+            m.remove('key' + str(i))
+        m.save(path)
+        loaded = HashMap.load(path)
+        result = dict(loaded.items()) == dict(m.items()) and loaded.get_size() == m.get_size()
+        result &= loaded.get_capacity() == m.get_capacity()
+        result &= loaded.get_tombstone_count() == m.get_tombstone_count()
+        result &= all(loaded.contains_key('key' + str(i)) == (i % 3 != 0) for i in range(40))
+        print(options, loaded.get_size(), loaded.get_capacity(), loaded.get_tombstone_count(), result)
+    os.remove(path)
+
+    print("\nStats example")
+    print("-------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_stats()
+    for i in range(30):
+        m.put('key' + str(i), i)
+    for i in range(40):
+        m.get('key' + str(i))
+    for i in range(0, 30, 2):
+        m.remove('key' + str(i))
+    m.contains_key('key1')
+    m.pop('key3')
+    m.get_or_insert('key3', lambda: 3)
+    stats = m.get_stats()
+    # every operation is counted once, as a hit or a miss
+    counted = {name: sum(histogram.values()) for name, histogram in stats['probe_lengths'].items()}
+    result = counted == {'contains hit': 1, 'get hit': 30, 'get miss': 10, 'get_or_insert miss': 1, 'pop hit': 1,
+                         'put miss': 30, 'remove hit': 15}
+    # the table grew from its initial capacity, and every resize was recorded
+    result &= stats['resize_count'] > 0 and stats['resizes'][-1][1] == m.get_capacity()
+    result &= sum(stats['occupancy_histogram'].values()) == m.get_capacity() and stats['size'] == 15
+    print(stats['resize_count'], m.get_capacity(), round(stats['occupancy_dispersion'], 2), result)
+    m.disable_stats()
+    m.put('key0', 0)
+    m.get('key1')
+    stats = m.get_stats()
+    result = stats['probe_lengths'] == {} and stats['resize_count'] == 0 and m.get('key0') == 0
+    print(stats['size'], result)
+    # during an incremental resize, keys still in the old table are found and counted as hits, and the time spent
+    # moving entries is added to the resize
+    m = HashMap(11, hash_function_1, incremental=True)
+    for i in range(30):
+        m.put('key' + str(i), i)
+    m.enable_stats()
+    m.resize_table(200)
+    begun = m._stats.resizes[0][2]
+    result = m._old_buckets is not None and all(m.get('key' + str(i)) == i for i in range(30))
+    result &= m._stats.resizes[0][2] > begun
+    stats = m.get_stats()
+    result &= stats['probe_lengths'].keys() == {'get hit'} and stats['resize_count'] == 1
+    print(stats['resizes'][0][:2], result)
+
+    print("\nPower of two example")
+    print("--------------------")
+    # hash_function_1 only sums the characters, but mix_hash spreads its result over the low bits used as the index
+    m = HashMap(10, hash_function_1, max_load=0.9, power_of_two=True)
+    capacities = [m.get_capacity()]
+    highest_load = 0
+    for i in range(1000):
+        m.put('key' + str(i), i)
+        highest_load = max(highest_load, m.table_load())
+        if m.get_capacity() != capacities[-1]:
+            capacities.append(m.get_capacity())
+    m.resize_table(3000)
+    capacities.append(m.get_capacity())
+    result = all(capacity & (capacity - 1) == 0 for capacity in capacities)
+    result &= all(m.get('key' + str(i)) == i for i in range(1000))
+    result &= not any(m.contains_key('key' + str(i)) for i in range(1000, 1100))
+    # put() only grows the table once the load has reached max_load, so one more key can go in before it does
+    result &= 0.85 < highest_load < 1
+    print(capacities, round(highest_load, 2), result)
+
+    print("\nIncremental migration example")
+    print("-----------------------------")
+    import random
+    rng = random.Random(0)
+    m = HashMap(11, hash_function_1, incremental=True)
+    expected = {}
+    migrating_steps = 0
+    cleared = False
+    result = True
+    for step in range(1500):
+        migrating = m._old_buckets is not None
+        migrating_steps += migrating
+        if migrating and not cleared and step > 1000:
+            # clear the map in the middle of a migration, which has to drop the old table too
+            m.clear()
+            expected.clear()
+            cleared = True
+        key = 'key' + str(rng.randrange(400))
+        action = rng.randrange(6)
+        if action < 2:
+            m.put(key, step)
+            expected[key] = step
+        elif action == 2:
+            result &= m.get(key) == expected.get(key)
+        elif action == 3:
+            m.remove(key)
+            expected.pop(key, None)
+        elif action == 4:
+            result &= m.pop(key, 'missing') == expected.pop(key, 'missing')
+        else:
+            pairs = [('key' + str(rng.randrange(400)), step) for _ in range(5)]
+            m.put_many(pairs)
+            expected.update(pairs)
+        result &= m.get_size() == len(expected)
+    result &= cleared and dict(m.items()) == expected
+    print(migrating_steps, m.get_size(), m.get_capacity(), result)
@@ -6,27 +6,86 @@
 # Description: This file contains the code for a HashMap class that utilizes a separate chaining methodology.
 
 
-from a6_include import (DynamicArray, LinkedList, hash_function_1, hash_function_2)
+import math
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from itertools import islice
+
+from a6_include import (DynamicArray, HashMapItemsView, HashMapKeysView, HashMapStats, HashMapValuesView, LinkedList,
+                        MixedHashFunction, SLNode, batch_hash, hash_function_1, hash_function_2, is_prime, next_prime)
+from hash_map_snapshot import (SEPARATE_CHAINING, read_snapshot, write_snapshot)
+
+
+# Number of old buckets moved by every lookup or update while an incremental resize is in progress
+MIGRATION_STEP = 8
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 max_load: float = None,
+                 growth_factor: float = 2.0,
+                 min_load: float = None,
+                 min_capacity: int = 1,
+                 expected_size: int = None,
+                 incremental: bool = False,
+                 power_of_two: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        The table never resizes itself unless a growth policy is given:
+        max_load - put() grows the table by growth_factor once the load factor goes above this value
+        min_load - remove() shrinks the table by growth_factor once the load factor drops below this value,
+                   but never below min_capacity buckets
+        expected_size - number of elements the caller expects to store, used to size the initial table
+        incremental - resize_table() keeps the old bucket array and every later lookup or update moves
+                      MIGRATION_STEP of its buckets into the new one, instead of copying the table in one go
+        power_of_two - the capacity is always a power of two instead of a prime, and hashes are run through
+                       mix_hash() so that the low bits which pick the bucket depend on the whole hash
         """
+        if growth_factor <= 1:
+            raise ValueError(f"growth_factor must be greater than 1, got {growth_factor}")
+        if max_load is not None and max_load <= 0:
+            raise ValueError(f"max_load must be positive, got {max_load}")
+        if min_load is not None and max_load is not None and min_load * growth_factor >= max_load:
+            raise ValueError(f"min_load {min_load} would make a shrink immediately exceed max_load {max_load}")
+        self._max_load = max_load
+        self._min_load = min_load
+        self._growth_factor = growth_factor
+        self._min_capacity = min_capacity
+        self._incremental = incremental
+        self._power_of_two = power_of_two
+        # While an incremental resize is in progress: the old bucket array and capacity, the next old bucket to move
+        # and the next new bucket to give a linked list (see _begin_migration)
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._allocate_index = 0
+
+        capacity = max(capacity, min_capacity)
+        if expected_size is not None:
+            capacity = max(capacity, math.ceil(expected_size / (max_load or 1.0)))
+
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number (or a power of two in power of two mode)
+        self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        self._hash_function = function
+        self._hash_function = MixedHashFunction(function) if power_of_two else function
         self._size = 0
+        # number of buckets whose linked list is not empty, kept up to date by every update
+        self._non_empty_buckets = 0
+        # incremented whenever a key is added or removed or the table is rebuilt, so iterators can detect it
+        self._version = 0
+        # HashMapStats collecting chain probe lengths and resizes, or None while stats are off (see enable_stats)
+        self._stats = None
 
     def __str__(self) -> str:
         """
@@ -71,6 +130,15 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity to use for a table of at least the given size: the next power of two in power of two
+        mode, otherwise the next prime (see next_prime in a6_include).
+        """
+        if self._power_of_two:
+            return 1 << (max(capacity, 1) - 1).bit_length()
+        return next_prime(capacity)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -93,33 +161,81 @@ class HashMap:
         the key value pair to the underlying data structrue
         """
         # Calculate the hash value
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        self._put_hashed(key, value, self._hash_function(key))
+        self._apply_growth_policy()
 
-        list_head = self._buckets[index]
-
-        # Add the key/value pair to a linked list that does not already contain it
-        if list_head.length() == 0 or list_head.contains(key) is None:
-            list_head.insert(key, value)
-            self._size += 1
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Adds or updates an item whose hash has already been calculated, without applying the growth policy.
+        """
+        list_head, node = self._find(key, hash_value, 'put')
+        if node is None:
+            # Add the key/value pair to a linked list that does not already contain it
+            self._insert_new(list_head, key, value, hash_value)
         else:
             # Update the value
-            node = list_head.contains(key)
             node.value = value
 
+    def _find(self, key: str, hash_value: int, operation: str = None) -> (LinkedList, SLNode):
+        """
+        Searches the key's bucket once. Returns a tuple of the bucket's linked list and the node holding the key
+        (None if the key is not stored).
+        While stats are on, the nodes examined are counted under the name of the calling operation, if one is given.
+        """
+        if self._old_buckets is not None:
+            self._advance_migration(hash_value)
+        list_head = self._buckets[hash_value % self._capacity]
+        if self._stats is None or operation is None:
+            return list_head, list_head.contains(key, hash_value)
+        node, previous, examined = list_head.find(key, hash_value)
+        self._stats.record_probe(operation, node is not None, examined)
+        return list_head, node
+
+    def _insert_new(self, list_head: LinkedList, key: str, value: object, hash_value: int) -> None:
+        """
+        Adds a key that _find() reported as missing to the linked list it returned.
+        """
+        if list_head.length() == 0:
+            self._non_empty_buckets += 1
+        list_head.insert(key, value, hash_value)
+        self._size += 1
+        self._version += 1
+
+    def increment(self, key: str, by: int = 1) -> int:
+        """
+        This method adds by to the value of the given key, which is treated as 0 if the key is not in the hash map,
+        and returns the new value. The key's bucket is only searched once.
+        """
+        return self._increment_hashed(key, by, self._hash_function(key))
+
+    def _increment_hashed(self, key: str, by: int, hash_value: int) -> int:
+        """
+        Increments a key whose hash has already been calculated, applying the growth policy if the key is new.
+        """
+        list_head, node = self._find(key, hash_value, 'increment')
+        if node is not None:
+            node.value += by
+            return node.value
+
+        self._insert_new(list_head, key, by, hash_value)
+        self._apply_growth_policy()
+        return by
+
+    def _apply_growth_policy(self) -> None:
+        """
+        Grows the table by the growth factor if a maximum load is set and the load factor has gone above it.
+        """
+        if self._max_load is not None and self._size / self._capacity > self._max_load:
+            self.resize_table(math.ceil(self._capacity * self._growth_factor))
+
     def empty_buckets(self) -> int:
         """
-        This method returns the number of empty buckets in the hash table.
+        This method returns the number of empty buckets in the hash table. A migration in progress is finished
+        first, since the new table's count only includes the keys already moved into it.
         """
-        sum = 0
-        # Iterate over each index, sum up the number of None items
-        index = 0
-        while index < self.get_capacity():
-            list_head = self._buckets[index]
-            if list_head.length() == 0:
-                sum += 1
-            index += 1
-        return sum
+        if self._old_buckets is not None:
+            self._finish_migration()
+        return self._capacity - self._non_empty_buckets
 
     def table_load(self) -> float:
         """
@@ -127,56 +243,154 @@ class HashMap:
         Load factor = total number of elements stored in the table / number of buckets
         𝝺 = n / m
         """
-        index = 0
-        # sum the lengths of each linked list in the dynamic array
-        num_elements = 0
-        while index < self._buckets.length():
-            num_elements += self._buckets[index].length()
-            index += 1
-
-        num_buckets = self._buckets.length()
-        return num_elements / num_buckets
+        return self._size / self._capacity
 
     def clear(self) -> None:
         """
         This method clears the contents of the hash map. It does not change the underlying hash
         table capacity.
         """
+        if self._old_buckets is not None:
+            self._finish_migration()
         index = 0
         while index < self._buckets.length():
-            for node in self._buckets[index]:
-                if self._buckets[index].remove(node.key) is True:
-                    self._size -= 1
+            if self._buckets[index].length() > 0:
+                self._buckets[index] = LinkedList()
             index += 1
+        self._size = 0
+        self._non_empty_buckets = 0
+        self._version += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes the capacity of the internal hash table. All existing key/value pairs will be copied over into their new
         hash map location.
-        If the new capacity is not a prime number, the next closest prime will be found and used.
+        If the new capacity is not a prime number, the next closest prime (or power of two in power of two mode) will
+        be found and used.
+        In incremental mode the pairs are moved over the following operations instead (see _begin_migration).
         """
         if new_capacity < 1:
             return
-        if self._is_prime(new_capacity) is False:
-            new_capacity = self._next_prime(new_capacity)
+        if self._power_of_two or is_prime(new_capacity) is False:
+            new_capacity = self._round_capacity(new_capacity)
+
+        if self._old_buckets is not None:
+            self._finish_migration()
+        old_capacity = self._capacity
+        started = time.perf_counter() if self._stats is not None else 0.0
+        if self._incremental:
+            self._begin_migration(new_capacity)
+        else:
+            self._move_buckets(new_capacity)
+        if self._stats is not None:
+            self._stats.record_resize(old_capacity, new_capacity, time.perf_counter() - started)
 
+    def _move_buckets(self, new_capacity: int) -> None:
+        """
+        Copies every pair into a new bucket array of the given capacity at once (see resize_table).
+        """
         new_hash_da = DynamicArray()
         for i in range(0, new_capacity):
             new_hash_da.append(LinkedList())
 
+        non_empty_buckets = 0
         index = 0
         while index < self._buckets.length():
             for node in self._buckets[index]:
-                # Calculate the hash value
-                hash_value = self._hash_function(node.key)
-                new_index = hash_value % new_capacity
+                # Reuse the hash cached in the node rather than hashing the key again
+                new_index = node.hash_value % new_capacity
 
-                new_hash_da[new_index].insert(node.key, node.value)
+                if new_hash_da[new_index].length() == 0:
+                    non_empty_buckets += 1
+                new_hash_da[new_index].insert(node.key, node.value, node.hash_value)
                 # new_hash_da.set_at_index(index, SLNode(node.key, node.value))
             index += 1
 
         self._buckets = new_hash_da
         self._capacity = new_capacity
+        self._non_empty_buckets = non_empty_buckets
+        self._version += 1
+
+    def _begin_migration(self, new_capacity: int) -> None:
+        """
+        Starts an incremental resize: a new bucket array of the given (prime) capacity becomes the table, and the
+        current one is kept as the old table until all of its buckets have been moved. Every key is in exactly one of
+        the two tables. _find() and _remove_hashed() first move the old bucket the key hashes to, and then the next
+        MIGRATION_STEP old buckets, so everything after that only has to look at the new table.
+        Creating a linked list for every new bucket up front would itself take time proportional to the capacity, so
+        the new buckets start out as None and are given their linked lists a few at a time as the migration advances.
+        """
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+        self._allocate_index = 0
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._non_empty_buckets = 0
+        self._version += 1
+
+    def _advance_migration(self, hash_value: int) -> None:
+        """
+        Moves the old bucket for the given hash, then the next MIGRATION_STEP old buckets, into the new table. The
+        new bucket for the hash is given its linked list first, and enough others to have them all allocated by the
+        time the last old bucket is moved. While stats are on, the time taken is added to the resize that started the
+        migration.
+        """
+        started = time.perf_counter() if self._stats is not None else 0.0
+        index = hash_value % self._capacity
+        if self._buckets[index] is None:
+            self._buckets[index] = LinkedList()
+        end = min(self._allocate_index + math.ceil(self._capacity * MIGRATION_STEP / self._old_capacity),
+                  self._capacity)
+        while self._allocate_index < end:
+            if self._buckets[self._allocate_index] is None:
+                self._buckets[self._allocate_index] = LinkedList()
+            self._allocate_index += 1
+
+        self._migrate_bucket(hash_value % self._old_capacity)
+        end = min(self._migrate_index + MIGRATION_STEP, self._old_capacity)
+        while self._migrate_index < end:
+            self._migrate_bucket(self._migrate_index)
+            self._migrate_index += 1
+        if self._stats is not None:
+            self._stats.add_resize_time(time.perf_counter() - started)
+        if self._migrate_index == self._old_capacity:
+            self._finish_migration()
+
+    def _migrate_bucket(self, old_index: int) -> None:
+        """
+        Moves every pair in the given bucket of the old table into the new table. The old bucket is set to None, so
+        the old table is freed one bucket at a time rather than all at once at the end.
+        """
+        list_head = self._old_buckets[old_index]
+        if list_head is None:
+            return
+        self._old_buckets[old_index] = None
+        for node in list_head:
+            index = node.hash_value % self._capacity
+            new_list = self._buckets[index]
+            if new_list is None:
+                new_list = self._buckets[index] = LinkedList()
+            if new_list.length() == 0:
+                self._non_empty_buckets += 1
+            new_list.insert(node.key, node.value, node.hash_value)
+
+    def _finish_migration(self) -> None:
+        """
+        Moves every bucket still in the old table and gives every new bucket its linked list, completing an
+        incremental resize at once.
+        """
+        started = time.perf_counter() if self._stats is not None else 0.0
+        while self._migrate_index < self._old_capacity:
+            self._migrate_bucket(self._migrate_index)
+            self._migrate_index += 1
+        while self._allocate_index < self._capacity:
+            if self._buckets[self._allocate_index] is None:
+                self._buckets[self._allocate_index] = LinkedList()
+            self._allocate_index += 1
+        self._old_buckets = None
+        if self._stats is not None:
+            self._stats.add_resize_time(time.perf_counter() - started)
 
     def get(self, key: str) -> object:
         """
@@ -185,46 +399,115 @@ class HashMap:
         """
         # Find the hash value index, then search for the key
         # Calculate the hash value
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        return self._get_hashed(key, self._hash_function(key))
 
-        for node in self._buckets[index]:
-            if node.key == key:
-                return node.value
-        return None
+    def _get_hashed(self, key: str, hash_value: int) -> object:
+        """
+        Returns the value for a key whose hash has already been calculated, or None if it is not stored.
+        """
+        list_head, node = self._find(key, hash_value, 'get')
+        if node is None:
+            return None
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
         This method returns True if the given key is in the hash map, otherwise it returns False. An
         empty hash map does not contain any keys.
         """
-        if self.get(key) is None:
-            return False
-        return True
+        list_head, node = self._find(key, self._hash_function(key), 'contains')
+        return node is not None
+
+    def _find_entry(self, key: str) -> SLNode:
+        """
+        Returns the node of the given key, or None if the key is not in the hash map, with a single bucket search.
+        """
+        return self._find(key, self._hash_function(key), 'contains')[1]
 
     def remove(self, key: str) -> None:
         """
         This method removes the given key and its associated value from the hash map. If the key
         is not in the hash map, the method does nothing (no exception needs to be raised).
         """
-        if self.contains_key(key) is False:
-            return
-
-        # Find and remove the item
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        # Calculate the hash value
+        self._remove_hashed(key, self._hash_function(key))
+        self._apply_shrink_policy()
 
-        # for node in self._buckets[index]:
-        self._buckets[index].remove(key)
+    def _remove_hashed(self, key: str, hash_value: int, operation: str = 'remove') -> SLNode:
+        """
+        Removes a key whose hash has already been calculated, without applying the shrink policy.
+        Returns the removed node, or None if the key was not stored. While stats are on, the nodes examined are
+        counted under the given operation name.
+        """
+        if self._old_buckets is not None:
+            self._advance_migration(hash_value)
+        list_head = self._buckets[hash_value % self._capacity]
+        if self._stats is None:
+            node = list_head.pop(key, hash_value)
+        else:
+            node, previous, examined = list_head.find(key, hash_value)
+            self._stats.record_probe(operation, node is not None, examined)
+            if node is not None:
+                list_head.unlink(node, previous)
+        if node is None:
+            return None
 
         # decrement the size
         self._size -= 1
+        self._version += 1
+        if list_head.length() == 0:
+            self._non_empty_buckets -= 1
+        return node
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        This method removes the given key from the hash map and returns its value. If the key is not in the hash map,
+        default is returned instead.
+        """
+        node = self._remove_hashed(key, self._hash_function(key), 'pop')
+        if node is None:
+            return default
+        self._apply_shrink_policy()
+        return node.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, it is added with the
+        value default, which is then returned.
+        """
+        return self.get_or_insert(key, lambda: default)
+
+    def get_or_insert(self, key: str, factory: callable) -> object:
+        """
+        This method returns the value of the given key. If the key is not in the hash map, factory() is called to
+        create its value, which is added to the hash map and returned.
+        """
+        hash_value = self._hash_function(key)
+        list_head, node = self._find(key, hash_value, 'get_or_insert')
+        if node is not None:
+            return node.value
+
+        value = factory()
+        self._insert_new(list_head, key, value, hash_value)
+        self._apply_growth_policy()
+        return value
+
+    def _apply_shrink_policy(self) -> None:
+        """
+        Shrinks the table by the growth factor if a minimum load is set and the load factor has dropped below it.
+        """
+        if self._min_load is not None and self._size / self._capacity < self._min_load:
+            new_capacity = self._round_capacity(max(self._min_capacity, int(self._capacity / self._growth_factor)))
+            if new_capacity < self._capacity:
+                self.resize_table(new_capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         This method returns a dynamic array where each index contains a tuple of a key / value pair
         stored in the hash map.
         """
+        if self._old_buckets is not None:
+            self._finish_migration()
         out_da = DynamicArray()
 
         index = 0
@@ -236,49 +519,382 @@ class HashMap:
 
         return out_da
 
+    def enable_stats(self) -> None:
+        """
+        This method starts collecting probe length and resize statistics, reported by get_stats(). Every lookup
+        (get, put, increment, contains, remove, pop and get_or_insert) counts the chain nodes its single search
+        examined, and every resize its duration, including the steps of an incremental resize. With stats off, this
+        costs one check per operation.
+        """
+        if self._stats is None:
+            self._stats = HashMapStats()
+
+    def disable_stats(self) -> None:
+        """
+        This method stops collecting statistics and discards the collected counters.
+        """
+        self._stats = None
+
+    def get_stats(self) -> dict:
+        """
+        This method returns a dictionary of statistics (see HashMapStats.report): the probe length histograms and
+        resizes collected since enable_stats() (empty if stats are off), the current size, capacity and load factor,
+        and the length of the longest chain. Its occupancy histogram is the chain length distribution: for each
+        chain length, the number of buckets whose linked list has that length.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        chain_lengths = [self._buckets[index].length() for index in range(self._capacity)]
+        stats = self._stats if self._stats is not None else HashMapStats()
+        return stats.report(chain_lengths, size=self._size, capacity=self._capacity, table_load=self.table_load(),
+                            longest_chain=max(chain_lengths))
+
+    def keys(self) -> HashMapKeysView:
+        """
+        This method returns a live view of the keys in the hash map, which streams them without copying.
+        """
+        return HashMapKeysView(self)
+
+    def values(self) -> HashMapValuesView:
+        """
+        This method returns a live view of the values in the hash map, which streams them without copying.
+        """
+        return HashMapValuesView(self)
+
+    def items(self) -> HashMapItemsView:
+        """
+        This method returns a live view of the (key, value) pairs in the hash map, which streams them without copying.
+        """
+        return HashMapItemsView(self)
+
+    def __iter__(self):
+        """
+        Iterate over the keys of the hash map.
+        """
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        """
+        Return the number of elements in the hash map.
+        """
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map, supporting the in operator.
+        """
+        return self.contains_key(key)
+
+    def _iter_entries(self):
+        """
+        Yield every SLNode straight from the buckets. Raises RuntimeError if the hash map has keys added or removed,
+        or is resized, while the iteration is in progress. An incremental resize in progress is finished first, since
+        lookups made during the iteration would otherwise move pairs between the tables.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        version = self._version
+        index = 0
+        while index < self._capacity:
+            for node in self._buckets[index]:
+                yield node
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+            index += 1
+
+    def save(self, path: str) -> None:
+        """
+        This method writes the hash map to a binary snapshot file (see hash_map_snapshot), including every entry's
+        bucket and cached hash. Only maps using hash_function_1 or hash_function_2 can be saved.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        buckets, hashes, keys, values = array('Q'), array('Q'), [], []
+
+        index = 0
+        while index < self._capacity:
+            for node in self._buckets[index]:
+                buckets.append(index)
+                hashes.append(node.hash_value)
+                keys.append(node.key)
+                values.append(node.value)
+            index += 1
+
+        options = {'max_load': self._max_load, 'growth_factor': self._growth_factor, 'min_load': self._min_load,
+                   'min_capacity': self._min_capacity, 'incremental': self._incremental,
+                   'power_of_two': self._power_of_two}
+        function = self._hash_function.function if self._power_of_two else self._hash_function
+        write_snapshot(path, SEPARATE_CHAINING, function, self._capacity, options,
+                       buckets, hashes, keys, values)
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        This method returns a new hash map read from a snapshot file written by save(). Entries go straight back into
+        their saved buckets with their saved hashes, without calling put() or the hash function.
+        """
+        snapshot = read_snapshot(path, SEPARATE_CHAINING)
+        hash_map = cls(snapshot.capacity, snapshot.function, **snapshot.options)
+        if hash_map.get_capacity() != snapshot.capacity:
+            hash_map.resize_table(snapshot.capacity)
+            if hash_map._old_buckets is not None:
+                hash_map._finish_migration()
+
+        # Insert back to front, so every linked list ends up in its saved order
+        position = len(snapshot.keys) - 1
+        while position >= 0:
+            hash_map._insert_new(hash_map._buckets[snapshot.buckets[position]], snapshot.keys[position],
+                                 snapshot.values[position], snapshot.hashes[position])
+            position -= 1
+        return hash_map
+
+    def put_many(self, pairs, hashes: list = None) -> None:
+        """
+        Adds (or updates) every (key, value) pair in pairs. All keys are hashed in a single batch and, when a growth
+        policy is set, the table is resized at most once, before any pair is added, to fit the case where every key
+        is new.
+        hashes can hold the keys' hashes, already calculated with this map's hash function, to skip hashing.
+        """
+        pairs = list(pairs)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, [pair[0] for pair in pairs])
+
+        needed = self._size + len(pairs)
+        if self._max_load is not None and needed / self._capacity > self._max_load:
+            self.resize_table(math.ceil(needed / self._max_load))
+
+        index = 0
+        while index < len(pairs):
+            self._put_hashed(pairs[index][0], pairs[index][1], hashes[index])
+            index += 1
+
+    def get_many(self, keys, hashes: list = None) -> DynamicArray:
+        """
+        Returns a dynamic array with the value for each key in keys, in the same order (None for missing keys). All
+        keys are hashed in a single batch, unless their hashes are passed in.
+        """
+        keys = list(keys)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, keys)
+
+        out_da = DynamicArray()
+        index = 0
+        while index < len(keys):
+            out_da.append(self._get_hashed(keys[index], hashes[index]))
+            index += 1
+        return out_da
+
+    def remove_many(self, keys, hashes: list = None) -> None:
+        """
+        Removes every key in keys that is in the hash map. All keys are hashed in a single batch (unless their hashes
+        are passed in), and the shrink policy (if any) is applied once at the end.
+        """
+        keys = list(keys)
+        if hashes is None:
+            hashes = batch_hash(self._hash_function, keys)
+
+        index = 0
+        while index < len(keys):
+            self._remove_hashed(keys[index], hashes[index])
+            index += 1
+        self._apply_shrink_policy()
+
+
+# Default number of items counted per parallel find_mode task, and bytes read per find_mode_file task
+FIND_MODE_CHUNK = 100000
+FIND_MODE_CHUNK_BYTES = 1 << 24
+
+# Bytes that separate the tokens of a file passed to find_mode_file()
+WHITESPACE = b' \t\n\r\x0b\x0c'
 
-def find_mode(da: DynamicArray) -> (DynamicArray, int):
+
+def find_mode(da: DynamicArray, processes: int = None, chunk_size: int = FIND_MODE_CHUNK) -> (DynamicArray, int):
     """
     This function takes in a dynamic array, and returns a tuple, where the first item is a dynamic array of the mode
     item(s), and the second item is the frequency.
     It is implemented in O(n) runtime
+    If processes is given, the items are counted in parallel by a pool of that many processes (see
+    _parallel_find_mode), and da can also be any iterable of strings. The mode items are then listed in sorted
+    order rather than in the order they reached the top frequency.
     """
+    if processes is not None:
+        if isinstance(da, DynamicArray):
+            iterator = (da[index] for index in range(da.length()))
+        else:
+            iterator = iter(da)
+        return _parallel_find_mode(processes, _count_items, iter(lambda: list(islice(iterator, chunk_size)), []))
+
     # if you'd like to use a hash map,
     # use this instance of your Separate Chaining HashMap
-    map = HashMap()
+    map = HashMap(function=hash_function_1, max_load=1.0)
     largest_frequency = 0
     items_da = DynamicArray()
 
-    # Iterate through the dynamic array, we can use the frequency as the key, aka 1: "apple" if there was
-    # only 1 apple occurence.
+    # Count each item with a single probe; the mode items are listed in the order they reached the top frequency
     index = 0
     while index < da.length():
-        if map.contains_key(da[index]) is False:
-            curr_frequency = 1
-            map.put(da[index], curr_frequency)
-        else:
-            # update the frequency as it already exists in the hashmap
-            curr_frequency = map.get(da[index])
-            curr_frequency += 1
-            # if curr_frequency >= largest_frequency:
-            #     largest_frequency = curr_frequency
-            map.put(da[index], curr_frequency)
-
-        # Remove all other values, add new value ot the items_da
+        curr_frequency = map.increment(da[index])
+
         if curr_frequency == largest_frequency:
             items_da.append(da[index])
-        if curr_frequency > largest_frequency:
+        elif curr_frequency > largest_frequency:
             largest_frequency = curr_frequency
-            while items_da.length() > 0:
-                items_da.pop()
-
-            items_da.append(da[index])
+            items_da = DynamicArray([da[index]])
 
         index += 1
 
-    print(map)
     return (items_da, largest_frequency)
 
+
+def find_mode_file(path: str, processes: int = None, chunk_bytes: int = FIND_MODE_CHUNK_BYTES) -> (DynamicArray, int):
+    """
+    This function returns the mode(s) and frequency of the whitespace separated UTF-8 tokens in the file at path, in
+    the same form as find_mode(). The file is split into byte ranges of about chunk_bytes, which the worker processes
+    read and count on their own, so the tokens never pass through this process. processes defaults to one per CPU.
+    """
+    processes = processes or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    ranges = ((path, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes))
+    return _parallel_find_mode(processes, _count_file_range, ranges)
+
+
+def _parallel_find_mode(processes: int, count_task: callable, tasks) -> (DynamicArray, int):
+    """
+    Map-reduce find_mode. In the map step each task is counted into its own HashMap by count_task, whose entries are
+    split into one partition per process by hash and spilled to a temporary directory by _spill_counts. In the reduce
+    step each partition's files are merged into a single HashMap by _merge_partition, reusing the hashes cached by the
+    map step, so every key is only merged by one process and never hashed twice. The counts never pass through this
+    process: it only keeps the mode(s) of the partitions with the largest frequency so far.
+    """
+    if processes < 1:
+        raise ValueError(f"processes must be at least 1, got {processes}")
+
+    largest_frequency = 0
+    mode = []
+    with tempfile.TemporaryDirectory() as spill_dir, multiprocessing.Pool(processes) as pool:
+        jobs = ((count_task, task, processes, spill_dir, number) for number, task in enumerate(tasks))
+        for _ in pool.imap_unordered(_spill_counts, jobs):
+            pass
+        partitions = ((spill_dir, partition) for partition in range(processes))
+        for keys, frequency in pool.imap_unordered(_merge_partition, partitions):
+            if frequency > largest_frequency:
+                largest_frequency = frequency
+                mode = keys
+            elif frequency == largest_frequency and frequency > 0:
+                mode.extend(keys)
+
+    return (DynamicArray(sorted(mode)), largest_frequency)
+
+
+def _spill_counts(job: tuple) -> None:
+    """
+    Map step of parallel find_mode: run count_task on one task and write each of its partitions that holds any keys
+    to its own file in spill_dir, named after the partition and the task number.
+    """
+    count_task, task, partitions, spill_dir, number = job
+    parts = count_task((task, partitions))
+    for partition in range(partitions):
+        if parts[partition][0]:
+            with open(os.path.join(spill_dir, f'{partition}-{number}'), 'wb') as file:
+                pickle.dump(parts[partition], file, pickle.HIGHEST_PROTOCOL)
+
+
+def _partition_counts(counts: HashMap, partitions: int) -> list:
+    """
+    Split the entries of a counting HashMap by hash into partitions lists of (keys, hashes, counts).
+    """
+    parts = [([], [], []) for _ in range(partitions)]
+    for node in counts._iter_entries():
+        keys, hashes, frequencies = parts[node.hash_value % partitions]
+        keys.append(node.key)
+        hashes.append(node.hash_value)
+        frequencies.append(node.value)
+    return parts
+
+
+def _count_items(task: tuple) -> list:
+    """
+    Map step of parallel find_mode over a list of items: count them and return the partitioned counts.
+    """
+    items, partitions = task
+    counts = HashMap(function=hash_function_1, max_load=1.0)
+    hashes = batch_hash(hash_function_1, items)
+    index = 0
+    while index < len(items):
+        counts._increment_hashed(items[index], 1, hashes[index])
+        index += 1
+    return _partition_counts(counts, partitions)
+
+
+def _count_file_range(task: tuple) -> list:
+    """
+    Map step of find_mode_file: count the tokens that start within a byte range of the file and return the
+    partitioned counts. A token that crosses the end of the range is read to its end here, and skipped by the range
+    it runs into.
+    """
+    (path, start, end), partitions = task
+    with open(path, 'rb') as file:
+        if start > 0:
+            file.seek(start - 1)
+            continues_token = file.read(1) not in WHITESPACE
+        else:
+            continues_token = False
+        data = file.read(end - start)
+        # Read on to the end of the last token
+        while data and data[-1:] not in WHITESPACE:
+            extra = file.read(4096)
+            if not extra:
+                break
+            cut = len(extra)
+            for separator in WHITESPACE:
+                found = extra.find(separator)
+                if found != -1 and found < cut:
+                    cut = found
+            data += extra[:cut]
+            if cut < len(extra):
+                break
+
+    if continues_token:
+        # The first token belongs to the previous range
+        cut = len(data)
+        for separator in WHITESPACE:
+            found = data.find(separator)
+            if found != -1 and found < cut:
+                cut = found
+        data = data[cut:]
+
+    return _count_items((data.decode('utf-8').split(), partitions))
+
+
+def _merge_partition(job: tuple) -> (list, int):
+    """
+    Reduce step of parallel find_mode: merge the counts of one partition spilled by every map task and return a list
+    of its mode key(s) and their frequency.
+    """
+    spill_dir, partition = job
+    prefix = f'{partition}-'
+    merged = HashMap(function=hash_function_1, max_load=1.0)
+    for name in os.listdir(spill_dir):
+        if not name.startswith(prefix):
+            continue
+        with open(os.path.join(spill_dir, name), 'rb') as file:
+            keys, hashes, frequencies = pickle.load(file)
+        index = 0
+        while index < len(keys):
+            merged._increment_hashed(keys[index], frequencies[index], hashes[index])
+            index += 1
+
+    largest_frequency = 0
+    mode = []
+    for key, frequency in merged.items():
+        if frequency > largest_frequency:
+            largest_frequency = frequency
+            mode = [key]
+        elif frequency == largest_frequency:
+            mode.append(key)
+    return mode, largest_frequency
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -482,3 +1098,183 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nParallel find_mode example")
+    print("-----------------------------")
+    da = DynamicArray(["2", "4", "2", "6", "8", "4", "1", "3", "4", "5", "7", "3", "3", "2"])
+    mode, frequency = find_mode(da, processes=2, chunk_size=4)
+    print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}")
+
+    print("\nViews example")
+    print("-------------")
+    m = HashMap(11, hash_function_2, max_load=1.0)
+    for i in range(20):
+        m.put('key' + str(i), i)
+    expected = {'key' + str(i): i for i in range(20)}
+    print(len(m.keys()), sorted(m.values()) == list(range(20)), dict(m.items()) == expected)
+    print('key3' in m.keys(), 'key30' in m.keys(), 3 in m.values(), ('key3', 3) in m.items(), ('key3', 4) in m.items())
+    m.put('key3', None)
+    print(('key3', None) in m.items(), ('key30', None) in m.items())
+    try:
+        for key in m:
+            m.put(key + '!', 0)
+        print('no error')
+    except RuntimeError as error:
+        print('RuntimeError:', error)
+
+    print("\nSingle probe example")
+    print("--------------------")
+    # every operation should hash its key exactly once
+    calls = [0]
+
+    def counting_hash(key: str) -> int:
+        calls[0] += 1
+        return hash_function_1(key)
+
+    m = HashMap(11, counting_hash, max_load=1.0)
+    m.put('key1', 10)
+    operations = [('put', lambda: m.put('key1', 11)),
+                  ('get', lambda: m.get('key1')),
+                  ('items contains', lambda: ('key1', 11) in m.items()),
+                  ('contains_key', lambda: m.contains_key('key2')),
+                  ('get_or_insert', lambda: m.get_or_insert('key2', int)),
+                  ('pop', lambda: m.pop('key2')),
+                  ('remove', lambda: m.remove('key1')),
+                  ('remove', lambda: m.remove('key9'))]
+    for name, operation in operations:
+        calls[0] = 0
+        operation()
+        print(name, calls[0])
+
+    print("\nBulk operations example")
+    print("-----------------------")
+    m = HashMap(11, hash_function_1, max_load=1.0)
+    pairs = [('key' + str(i), i) for i in range(200)] + [('key7', 'seven')]
+    m.put_many(pairs)
+    values = m.get_many(['key' + str(i) for i in range(202)])
+    result = values[7] == 'seven' and values[200] is None and values[201] is None
+    result &= all(values[i] == m.get('key' + str(i)) == i for i in range(200) if i != 7)
+    print(m.get_size(), m.get_capacity(), result)
+    m.remove_many(['key' + str(i) for i in range(0, 202, 2)])
+    result = all(m.contains_key('key' + str(i)) == (i % 2 == 1) for i in range(200))
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\nSnapshot example")
+    print("----------------")
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    m = HashMap(11, hash_function_2, max_load=1.0, min_load=0.25)
+    for i in range(300):
+        m.put('key' + str(i), [i])
+    for i in range(0, 300, 2):
+        m.remove('key' + str(i))
+    m.save(path)
+    loaded = HashMap.load(path)
+    result = dict(loaded.items()) == dict(m.items()) and loaded.get_size() == m.get_size()
+    result &= loaded.get_capacity() == m.get_capacity() and loaded.empty_buckets() == m.empty_buckets()
+    print(loaded.get_size(), loaded.get_capacity(), result)
+    # the growth policy is part of the snapshot, so the loaded map keeps shrinking and growing the same way
+    for i in range(1, 300, 2):
+        m.remove('key' + str(i))
+        loaded.remove('key' + str(i))
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get_capacity() == m.get_capacity())
+    os.remove(path)
+
+    print("\nStats example")
+    print("-------------")
+    m = HashMap(11, hash_function_1, max_load=1.0)
+    m.enable_stats()
+    for i in range(30):
+        m.put('key' + str(i), i)
+    for i in range(40):
+        m.get('key' + str(i))
+    for i in range(0, 30, 2):
+        m.remove('key' + str(i))
+    m.contains_key('key1')
+    m.pop('key3')
+    m.get_or_insert('key3', lambda: 3)
+    stats = m.get_stats()
+    # every operation is counted once, as a hit or a miss
+    counted = {name: sum(histogram.values()) for name, histogram in stats['probe_lengths'].items()}
+    result = counted == {'contains hit': 1, 'get hit': 30, 'get miss': 10, 'get_or_insert miss': 1, 'pop hit': 1,
+                         'put miss': 30, 'remove hit': 15}
+    # the table grew from its initial capacity, and every resize was recorded
+    result &= stats['resize_count'] > 0 and stats['resizes'][-1][1] == m.get_capacity()
+    result &= sum(stats['occupancy_histogram'].values()) == m.get_capacity() and stats['size'] == 15
+    print(stats['resize_count'], m.get_capacity(), round(stats['occupancy_dispersion'], 2), result)
+    m.disable_stats()
+    m.put('key0', 0)
+    m.get('key1')
+    stats = m.get_stats()
+    result = stats['probe_lengths'] == {} and stats['resize_count'] == 0 and m.get('key0') == 0
+    print(stats['size'], result)
+    # during an incremental resize, keys still in the old table are found and counted as hits, and the time spent
+    # moving entries is added to the resize
+    m = HashMap(11, hash_function_1, max_load=1.0, incremental=True)
+    for i in range(30):
+        m.put('key' + str(i), i)
+    m.enable_stats()
+    m.resize_table(200)
+    begun = m._stats.resizes[0][2]
+    result = m._old_buckets is not None and all(m.get('key' + str(i)) == i for i in range(30))
+    result &= m._stats.resizes[0][2] > begun
+    stats = m.get_stats()
+    result &= stats['probe_lengths'].keys() == {'get hit'} and stats['resize_count'] == 1
+    print(stats['resizes'][0][:2], result)
+
+    print("\nPower of two example")
+    print("--------------------")
+    # hash_function_1 only sums the characters, but mix_hash spreads its result over the low bits used as the index
+    m = HashMap(10, hash_function_1, max_load=1.0, power_of_two=True)
+    capacities = [m.get_capacity()]
+    for i in range(1000):
+        m.put('key' + str(i), i)
+        if m.get_capacity() != capacities[-1]:
+            capacities.append(m.get_capacity())
+    m.resize_table(3000)
+    capacities.append(m.get_capacity())
+    result = all(capacity & (capacity - 1) == 0 for capacity in capacities)
+    result &= all(m.get('key' + str(i)) == i for i in range(1000))
+    result &= not any(m.contains_key('key' + str(i)) for i in range(1000, 1100))
+    print(capacities, round(m.table_load(), 2), result)
+
+    print("\nIncremental migration example")
+    print("-----------------------------")
+    import random
+    rng = random.Random(0)
+    m = HashMap(11, hash_function_1, max_load=1.0, min_load=0.25, incremental=True)
+    expected = {}
+    migrating_steps = 0
+    cleared = False
+    result = True
+    for step in range(1500):
+        migrating = m._old_buckets is not None
+        migrating_steps += migrating
+        if migrating and not cleared and step > 1000:
+            # clear the map in the middle of a migration, which has to drop the old table too
+            m.clear()
+            expected.clear()
+            cleared = True
+        key = 'key' + str(rng.randrange(400))
+        action = rng.randrange(6)
+        if action < 2:
+            m.put(key, step)
+            expected[key] = step
+        elif action == 2:
+            result &= m.get(key) == expected.get(key)
+        elif action == 3:
+            m.remove(key)
+            expected.pop(key, None)
+        elif action == 4:
+            result &= m.pop(key, 'missing') == expected.pop(key, 'missing')
+        else:
+            pairs = [('key' + str(rng.randrange(400)), step) for _ in range(5)]
+            m.put_many(pairs)
+            expected.update(pairs)
+        result &= m.get_size() == len(expected)
+    result &= cleared and dict(m.items()) == expected
+    print(migrating_steps, m.get_size(), m.get_capacity(), result)
+    # empty_buckets() finishes a migration in progress, so it counts every key once
+    while m._old_buckets is None:
+        m.put('key' + str(m.get_size() * 2), 0)
+    empty = m.empty_buckets()
+    print(empty == sum(1 for i in range(m.get_capacity()) if m._buckets[i].length() == 0), m._old_buckets is None)
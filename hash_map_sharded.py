@@ -0,0 +1,346 @@
+# Description: This file contains code for a ShardedHashMap class, which hash-partitions keys over several worker
+# processes that each own an open addressing HashMap shard. Requests are batched per shard and passed through
+# multiprocessing.shared_memory buffers, so a single map can use more than one core.
+
+
+import multiprocessing
+import os
+import pickle
+import struct
+from array import array
+from multiprocessing import shared_memory
+
+from a6_include import (DynamicArray, HASH_MASK, MixedHashFunction, batch_hash, hash_function_1, hash_function_2)
+from hash_map_oa import HashMap, QUADRATIC, ROBIN_HOOD
+
+
+# Operations understood by the shard workers
+PUT = 0
+GET = 1
+REMOVE = 2
+CONTAINS = 3
+SIZE = 4
+CLEAR = 5
+CLOSE = 6
+
+# Request layout: count, key bytes length, values length, then the hashes, the key offsets, the UTF-8 keys and the
+# pickled list of values
+REQUEST_HEADER = struct.Struct('<QQQ')
+
+
+def _pack_request(hashes: list, keys: list, values: list = None) -> bytes:
+    """
+    Pack a batch of hashes, keys and (optionally) values into a single request buffer.
+    """
+    encoded = [key.encode('utf-8') for key in keys]
+    offsets = array('Q', [0])
+    for key in encoded:
+        offsets.append(offsets[-1] + len(key))
+    key_bytes = b''.join(encoded)
+    value_bytes = b'' if values is None else pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+    return b''.join((REQUEST_HEADER.pack(len(keys), len(key_bytes), len(value_bytes)),
+                     array('Q', hashes).tobytes(), offsets.tobytes(), key_bytes, value_bytes))
+
+
+def _unpack_request(buffer: memoryview) -> (list, list, list):
+    """
+    Unpack a request buffer written by _pack_request() into lists of hashes, keys and values (None if the request
+    carried no values).
+    """
+    count, key_length, value_length = REQUEST_HEADER.unpack_from(buffer)
+    position = REQUEST_HEADER.size
+    hashes = array('Q')
+    hashes.frombytes(buffer[position:position + 8 * count])
+    position += 8 * count
+    offsets = array('Q')
+    offsets.frombytes(buffer[position:position + 8 * (count + 1)])
+    position += 8 * (count + 1)
+    key_bytes = bytes(buffer[position:position + key_length])
+    position += key_length
+    keys = [key_bytes[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+    values = pickle.loads(buffer[position:position + value_length]) if value_length else None
+    return hashes.tolist(), keys, values
+
+
+def _shard_worker(connection, request_name: str, response_name: str, capacity: int, function,
+                  probing: str) -> None:
+    """
+    Main loop of a shard process: owns one HashMap and serves batched requests until told to close.
+    """
+    # The buffers belong to the parent, which unlinks them; workers share its resource tracker, so attaching here
+    # does not hand ownership to this process
+    request = shared_memory.SharedMemory(request_name)
+    response = shared_memory.SharedMemory(response_name)
+    shard = HashMap(capacity, function, probing)
+
+    while True:
+        operation, length, new_request_name = connection.recv()
+        if new_request_name is not None:
+            # The parent outgrew the old request buffer and handed over a bigger one
+            request.close()
+            request = shared_memory.SharedMemory(new_request_name)
+
+        result = None
+        if operation == PUT:
+            hashes, keys, values = _unpack_request(request.buf[:length])
+            shard.put_many(zip(keys, values), hashes)
+        elif operation == GET:
+            hashes, keys, values = _unpack_request(request.buf[:length])
+            found = shard.get_many(keys, hashes)
+            result = [found[i] for i in range(found.length())]
+        elif operation == REMOVE:
+            hashes, keys, values = _unpack_request(request.buf[:length])
+            shard.remove_many(keys, hashes)
+        elif operation == CONTAINS:
+            hashes, keys, values = _unpack_request(request.buf[:length])
+            result = [shard._find(keys[i], hashes[i])[1] for i in range(len(keys))]
+        elif operation == SIZE:
+            result = shard.get_size()
+        elif operation == CLEAR:
+            shard.clear()
+        elif operation == CLOSE:
+            request.close()
+            response.close()
+            connection.send((0, None))
+            return
+
+        if result is None:
+            connection.send((0, None))
+            continue
+        # Results go back through the response buffer, or inline through the pipe if they do not fit
+        blob = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        if len(blob) <= response.size:
+            response.buf[:len(blob)] = blob
+            connection.send((len(blob), None))
+        else:
+            connection.send((len(blob), blob))
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 shards: int = None,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 probing: str = QUADRATIC,
+                 buffer_size: int = 1 << 20) -> None:
+        """
+        Initialize new ShardedHashMap that starts one worker process per shard (one per CPU by default). Each worker
+        owns an open addressing HashMap created with the given capacity, hash function and probing mode, and talks
+        to this process through a request and a response shared memory buffer of buffer_size bytes each.
+        The hash function must be picklable (a module level function such as hash_function_1).
+        """
+        self._shards = shards or os.cpu_count() or 1
+        # the shards are handed the hashes calculated here, so they have to be mixed the same way as a Robin Hood
+        # HashMap mixes its own
+        self._hash_function = MixedHashFunction(function) if probing == ROBIN_HOOD else function
+        self._connections = []
+        self._processes = []
+        self._requests = []
+        self._responses = []
+        # request buffers replaced during the current batch, unlinked once the workers have switched over
+        self._retired = []
+
+        for _ in range(self._shards):
+            request = shared_memory.SharedMemory(create=True, size=buffer_size)
+            response = shared_memory.SharedMemory(create=True, size=buffer_size)
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker,
+                                              args=(child_end, request.name, response.name, capacity, function,
+                                                    probing),
+                                              daemon=True)
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+            self._requests.append(request)
+            self._responses.append(response)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Support use as a context manager, closing the workers on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the workers when leaving the with block."""
+        self.close()
+
+    def _shard_of(self, hash_value: int) -> int:
+        """
+        Return the shard that owns the given hash. The hash is scrambled first so that the keys of one shard still
+        spread over all the buckets of that shard's table.
+        """
+        return (((hash_value * 0x9E3779B97F4A7C15) & HASH_MASK) >> 32) % self._shards
+
+    def _partition(self, keys: list) -> (list, list):
+        """
+        Hash a batch of keys and group them by shard. Returns the batch's hashes and, for each shard, the positions in
+        the batch of the keys it owns.
+        """
+        hashes = [hash_value & HASH_MASK for hash_value in batch_hash(self._hash_function, keys)]
+        groups = [[] for _ in range(self._shards)]
+        position = 0
+        while position < len(keys):
+            groups[self._shard_of(hashes[position])].append(position)
+            position += 1
+        return hashes, groups
+
+    def _send(self, shard: int, operation: int, payload: bytes = b'') -> None:
+        """
+        Copy a request into the shard's request buffer (replacing the buffer with a bigger one if needed) and signal
+        the worker.
+        """
+        new_request_name = None
+        if len(payload) > self._requests[shard].size:
+            # The worker switches to the new buffer before replying, after which the old one can go
+            old_request = self._requests[shard]
+            self._requests[shard] = shared_memory.SharedMemory(create=True,
+                                                               size=max(len(payload), 2 * old_request.size))
+            self._retired.append(old_request)
+            new_request_name = self._requests[shard].name
+        self._requests[shard].buf[:len(payload)] = payload
+        self._connections[shard].send((operation, len(payload), new_request_name))
+
+    def _receive(self, shard: int) -> object:
+        """
+        Wait for the shard's reply and return its result (None for operations without one).
+        """
+        length, blob = self._connections[shard].recv()
+        if blob is None:
+            if length == 0:
+                return None
+            blob = bytes(self._responses[shard].buf[:length])
+        return pickle.loads(blob)
+
+    def _scatter(self, operation: int, keys: list, values: list = None) -> list:
+        """
+        Send one batched request to every shard that owns some of the keys, then collect the replies, so all shards
+        work on their part of the batch at the same time. Returns a list with the result for each key, in order.
+        """
+        self._retired = []
+        hashes, groups = self._partition(keys)
+        for shard in range(self._shards):
+            if groups[shard]:
+                self._send(shard, operation,
+                           _pack_request([hashes[i] for i in groups[shard]], [keys[i] for i in groups[shard]],
+                                         None if values is None else [values[i] for i in groups[shard]]))
+
+        results = [None] * len(keys)
+        for shard in range(self._shards):
+            if groups[shard]:
+                shard_results = self._receive(shard)
+                if shard_results is not None:
+                    position = 0
+                    while position < len(groups[shard]):
+                        results[groups[shard][position]] = shard_results[position]
+                        position += 1
+
+        for old_request in self._retired:
+            old_request.close()
+            old_request.unlink()
+        return results
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hash map (or updates it if it already exists).
+        """
+        self.put_many([(key, value)])
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        return self.get_many([key])[0]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False.
+        """
+        return self._scatter(CONTAINS, [key])[0]
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing.
+        """
+        self.remove_many([key])
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds (or updates) every (key, value) pair in pairs, sending one request per shard.
+        """
+        pairs = list(pairs)
+        self._scatter(PUT, [pair[0] for pair in pairs], [pair[1] for pair in pairs])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array with the value for each key in keys, in the same order (None for missing keys),
+        sending one request per shard.
+        """
+        out_da = DynamicArray()
+        for value in self._scatter(GET, list(keys)):
+            out_da.append(value)
+        return out_da
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every key in keys that is in the hash map, sending one request per shard.
+        """
+        self._scatter(REMOVE, list(keys))
+
+    def get_size(self) -> int:
+        """
+        Return size of map, summed over all shards.
+        """
+        for shard in range(self._shards):
+            self._send(shard, SIZE)
+        return sum(self._receive(shard) for shard in range(self._shards))
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of every shard.
+        """
+        for shard in range(self._shards):
+            self._send(shard, CLEAR)
+        for shard in range(self._shards):
+            self._receive(shard)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes and release the shared memory buffers. The map cannot be used afterwards.
+        """
+        if not self._processes:
+            return
+        for shard in range(self._shards):
+            self._send(shard, CLOSE)
+        for shard in range(self._shards):
+            self._receive(shard)
+            self._processes[shard].join()
+            self._connections[shard].close()
+            for buffer in (self._requests[shard], self._responses[shard]):
+                buffer.close()
+                buffer.unlink()
+        self._processes = []
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSharded put / get example")
+    print("-------------------------")
+    with ShardedHashMap(4, 53, hash_function_2) as m:
+        keys = [str(i) for i in range(1, 1000, 13)]
+        m.put_many((key, int(key) * 42) for key in keys)
+        print(m.get_size())
+
+        values = m.get_many(keys)
+        result = True
+        for i in range(len(keys)):
+            result &= values[i] == int(keys[i]) * 42
+            result &= not m.contains_key(str(int(keys[i]) + 1))
+        print(result)
+
+        m.remove_many(keys[::2])
+        print(m.get_size(), m.get(keys[0]), m.get(keys[1]))
@@ -0,0 +1,110 @@
+# Description: This file contains the versioned binary snapshot format used by HashMap.save() and HashMap.load() in
+# both the separate chaining and the open addressing implementations. A snapshot records the table layout (capacity,
+# hash function and each entry's bucket) together with the cached hashes, so loading rebuilds the buckets directly
+# without calling put() or the hash function.
+
+
+import pickle
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from a6_include import (HASH_FUNCTION_IDS, hash_function_id)
+
+
+MAGIC = b'HMAPSNAP'
+# Version 2: open addressing snapshots with Robin Hood probing hold mixed hashes (see hash_map_oa.HashMap)
+VERSION = 2
+
+# Kinds of hash map a snapshot can hold
+SEPARATE_CHAINING = 1
+OPEN_ADDRESSING = 2
+
+# magic, format version, kind, hash function id, capacity, entry count, tombstone count, then the byte lengths of the
+# pickled options, the UTF-8 keys and the pickled values. The header and the arrays after it are little-endian, so a
+# snapshot can be loaded on a machine with either byte order.
+HEADER = struct.Struct('<8sIBBxxQQQQQQ')
+
+Snapshot = namedtuple('Snapshot', 'function capacity options buckets hashes keys values tombstones')
+
+
+def _write_array(file, values: array) -> None:
+    """
+    Write an array('Q') to the file in little-endian order, whatever the byte order of this machine.
+    """
+    if sys.byteorder == 'big':
+        values = array('Q', values)
+        values.byteswap()
+    values.tofile(file)
+
+
+def write_snapshot(path: str, kind: int, function, capacity: int, options: dict, buckets: array, hashes: array,
+                   keys: list, values: list, tombstones: array = None) -> None:
+    """
+    Write a snapshot file. buckets and hashes are array('Q') objects holding, for each entry, its bucket index and its
+    cached hash; keys and values are lists in the same order. tombstones holds the bucket indexes of open addressing
+    tombstones, which have to be kept so that probe sequences running through them still work after loading.
+    options holds the constructor settings needed to recreate the map.
+    """
+    if tombstones is None:
+        tombstones = array('Q')
+    text = ''.join(keys)
+    # Key boundaries are counted in characters, so loading can decode all keys at once and slice the string
+    offsets = array('Q', [0])
+    for key in keys:
+        offsets.append(offsets[-1] + len(key))
+    key_bytes = text.encode('utf-8', 'surrogatepass')
+    option_bytes = pickle.dumps(options, pickle.HIGHEST_PROTOCOL)
+    value_bytes = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, kind, hash_function_id(function), capacity, len(keys), len(tombstones),
+                               len(option_bytes), len(key_bytes), len(value_bytes)))
+        file.write(option_bytes)
+        _write_array(file, buckets)
+        _write_array(file, hashes)
+        _write_array(file, tombstones)
+        _write_array(file, offsets)
+        file.write(key_bytes)
+        file.write(value_bytes)
+
+
+def read_snapshot(path: str, kind: int) -> Snapshot:
+    """
+    Read a snapshot file written by write_snapshot(), checking that it holds the given kind of hash map.
+    """
+    with open(path, 'rb') as file:
+        data = memoryview(file.read())
+
+    (magic, version, stored_kind, function_id, capacity, count, tombstone_count,
+     option_length, key_length, value_length) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} hash map snapshot")
+    if stored_kind != kind:
+        raise ValueError(f"{path} holds a different kind of hash map")
+
+    position = HEADER.size
+    options = pickle.loads(data[position:position + option_length])
+    position += option_length
+
+    def read_array(length: int) -> array:
+        nonlocal position
+        out = array('Q')
+        out.frombytes(data[position:position + 8 * length])
+        if sys.byteorder == 'big':
+            out.byteswap()
+        position += 8 * length
+        return out
+
+    buckets = read_array(count)
+    hashes = read_array(count)
+    tombstones = read_array(tombstone_count)
+    offsets = read_array(count + 1)
+
+    text = bytes(data[position:position + key_length]).decode('utf-8', 'surrogatepass')
+    position += key_length
+    keys = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+    values = pickle.loads(data[position:position + value_length])
+
+    return Snapshot(HASH_FUNCTION_IDS[function_id], capacity, options, buckets, hashes, keys, values, tombstones)
@@ -0,0 +1,389 @@
+# Description: This file contains code for a HashMap class, which is implemented using Open Addressing with a Swiss
+# table layout. Next to the flat key, value and hash arrays, every slot has a one byte control value: EMPTY, DELETED,
+# or the top 7 bits of the slot's hash. Slots are probed a group of GROUP_WIDTH control bytes at a time, and keys are
+# only compared in slots whose control byte already matches, so most probes (and nearly every miss) never touch a key.
+
+
+from array import array
+
+from a6_include import (DynamicArray, HASH_MASK, hash_function_1, hash_function_2)
+
+
+# Control byte values. A full slot stores the top 7 bits of its hash, so the high bit marks EMPTY and DELETED slots.
+EMPTY = 0x80
+DELETED = 0xFE
+H2_BITS = 7
+H2_SHIFT = 64 - H2_BITS
+
+# Hashes are multiplied by 2 ** 64 / golden ratio (Fibonacci hashing), which moves every bit of the hash function's
+# result into the high bits used for the control byte and the group
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# Number of slots whose control bytes are scanned together; the capacity is always a power of two multiple of this
+GROUP_WIDTH = 16
+
+# Full and deleted slots may take up at most 7/8 of the table before it grows or is rehashed
+MAX_LOAD = 7 / 8
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses
+        Swiss table group probing for collision resolution
+        """
+        # capacity must be a power of two, and at least one group
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._control[i] == EMPTY:
+                out += str(i) + ': None\n'
+            elif self._control[i] == DELETED:
+                out += str(i) + ': K: None V: None TS: True\n'
+            else:
+                out += str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) + ' TS: False\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Return the smallest power of two that is at least the given capacity and at least GROUP_WIDTH.
+        """
+        return 1 << (max(capacity, GROUP_WIDTH) - 1).bit_length()
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty arrays holding the given number of slots.
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', [0]) * capacity
+        self._control = bytearray([EMPTY]) * capacity
+        self._group_mask = capacity // GROUP_WIDTH - 1
+        # the group bits sit just below the control byte bits at the top of the hash
+        self._group_shift = H2_SHIFT - self._group_mask.bit_length()
+        # most slots that may be full or deleted before put() grows or rehashes the table
+        self._max_used = int(capacity * MAX_LOAD)
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the 64 bit Fibonacci hash of the key. Its top H2_BITS go into the control byte and the bits below them
+        pick the first group.
+        """
+        return ((self._hash_function(key) & HASH_MASK) * HASH_MULTIPLIER) & HASH_MASK
+
+    def _find(self, key: str, hash_value: int) -> int:
+        """
+        Return the slot index of the given key, or -1 if it is not in the table.
+        Each group is searched for control bytes equal to the key's 7 bit hash, and a group that still has an EMPTY
+        slot ends the search, since the key would have been placed there.
+        """
+        find = self._control.find
+        h2 = hash_value >> H2_SHIFT
+        group_mask = self._group_mask
+        group = (hash_value >> self._group_shift) & group_mask
+
+        # Groups are visited at triangular number offsets (0, 1, 3, 6, ...), which reach every group of the table
+        j = 0
+        while j <= group_mask:
+            start = group * GROUP_WIDTH
+            end = start + GROUP_WIDTH
+            index = find(h2, start, end)
+            while index != -1:
+                if self._hashes[index] == hash_value and self._keys[index] == key:
+                    return index
+                index = find(h2, index + 1, end)
+            if find(EMPTY, start, end) != -1:
+                return -1
+            j += 1
+            group = (group + j) & group_mask
+        return -1
+
+    def _find_slot(self, key: str, hash_value: int) -> (int, bool):
+        """
+        Probe for the given key. Returns a tuple of (index, found). When the key is not in the table, the index is the
+        slot the key should be inserted into: the first DELETED or EMPTY slot along the probe sequence.
+        """
+        find = self._control.find
+        h2 = hash_value >> H2_SHIFT
+        group_mask = self._group_mask
+        group = (hash_value >> self._group_shift) & group_mask
+        insert_index = -1
+
+        j = 0
+        while j <= group_mask:
+            start = group * GROUP_WIDTH
+            end = start + GROUP_WIDTH
+            index = find(h2, start, end)
+            while index != -1:
+                if self._hashes[index] == hash_value and self._keys[index] == key:
+                    return index, True
+                index = find(h2, index + 1, end)
+            empty = find(EMPTY, start, end)
+            if insert_index == -1:
+                deleted = find(DELETED, start, end)
+                insert_index = deleted if deleted != -1 else empty
+            if empty != -1:
+                return insert_index, False
+            j += 1
+            group = (group + j) & group_mask
+        return insert_index, False
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Move every full slot into freshly allocated arrays of the given (power of two) capacity. Deleted slots are
+        dropped. Keys are known to be unique, so each one goes straight into the first EMPTY slot of its probe sequence.
+        """
+        old_keys, old_values, old_hashes, old_control = self._keys, self._values, self._hashes, self._control
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+        find = self._control.find
+        group_mask = self._group_mask
+        group_shift = self._group_shift
+        index = 0
+        while index < len(old_control):
+            if old_control[index] < EMPTY:
+                hash_value = old_hashes[index]
+                group = (hash_value >> group_shift) & group_mask
+                start = group * GROUP_WIDTH
+                new_index = find(EMPTY, start, start + GROUP_WIDTH)
+                j = 0
+                while new_index == -1:
+                    j += 1
+                    group = (group + j) & group_mask
+                    start = group * GROUP_WIDTH
+                    new_index = find(EMPTY, start, start + GROUP_WIDTH)
+                self._control[new_index] = old_control[index]
+                self._keys[new_index] = old_keys[index]
+                self._values[new_index] = old_values[index]
+                self._hashes[new_index] = hash_value
+            index += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds an item to the hashmap (or updates if it already exists). Filling an EMPTY slot past the 7/8 limit on full
+        and deleted slots first doubles the table, or only rehashes it in place if deleted slots take up the room.
+        """
+        hash_value = self._hash(key)
+        index, found = self._find_slot(key, hash_value)
+
+        if found:
+            self._values[index] = value
+            return
+
+        if self._control[index] == EMPTY and self._size + self._tombstones >= self._max_used:
+            if self._size < self._max_used // 2:
+                self._rehash(self._capacity)
+            else:
+                self._rehash(self._capacity * 2)
+            index, found = self._find_slot(key, hash_value)
+
+        if self._control[index] == DELETED:
+            self._tombstones -= 1
+        self._control[index] = hash_value >> H2_SHIFT
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = hash_value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+        Load factor = total number of elements stored in the table / number of buckets
+        𝝺 = n / m
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of empty buckets (including deleted ones) in the hash table.
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the capacity of the internal hash table. All existing key/value pairs will be copied over into their new
+        hash map location.
+        If the new capacity is not a power of two, the next power of two will be used. The capacity keeps doubling
+        until the table load is at most 7/8.
+        """
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size > new_capacity * MAX_LOAD:
+            new_capacity *= 2
+
+        self._rehash(new_capacity)
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None.
+        """
+        index = self._find(key, self._hash(key))
+        if index != -1:
+            return self._values[index]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key is in the hash map, otherwise it returns False. An
+        empty hash map does not contain any keys.
+        """
+        return self._find(key, self._hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        index = self._find(key, self._hash(key))
+        if index == -1:
+            return
+
+        # A group that still has an EMPTY slot has never been full, so no probe sequence has continued past it and the
+        # slot can be emptied outright. Otherwise leave a DELETED marker so later probes keep going.
+        start = index - index % GROUP_WIDTH
+        if self._control.find(EMPTY, start, start + GROUP_WIDTH) != -1:
+            self._control[index] = EMPTY
+        else:
+            self._control[index] = DELETED
+            self._tombstones += 1
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        This method clears the contents of the hash map. It does not change the underlying hash
+        table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array where each index contains a tuple of a key / value pair
+        stored in the hash map.
+        """
+        out_da = DynamicArray()
+
+        index = 0
+        while index < self._capacity:
+            if self._control[index] < EMPTY:
+                out_da.append((self._keys[index], self._values[index]))
+            index += 1
+        return out_da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCapacity rounding example")
+    print("-------------------------")
+    m = HashMap(23, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+
+    print("\nResize load example")
+    print("-------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > MAX_LOAD:
+            print(f"Check that the load factor is acceptable after the call to resize_table().\n"
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to {MAX_LOAD}")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nDeleted slot example")
+    print("--------------------")
+    # with a constant hash every key starts in group 0: the first 16 fill it and the rest spill into group 1
+    m = HashMap(32, lambda key: 0)
+    for i in range(20):
+        m.put('key' + str(i), i)
+    full_group_slot = m._find('key0', m._hash('key0'))
+    open_group_slot = m._find('key19', m._hash('key19'))
+    m.remove('key0')
+    m.remove('key19')
+    # group 0 has no EMPTY slot, so probes for the keys in group 1 must keep going past the removed key
+    result = m._control[full_group_slot] == DELETED and m._control[open_group_slot] == EMPTY and m._tombstones == 1
+    m.put('new key', 20)
+    # the new key goes into the first DELETED slot along its probe sequence, before any EMPTY one
+    result &= m._find('new key', m._hash('new key')) == full_group_slot and m._tombstones == 0
+    result &= all(m.get('key' + str(i)) == i for i in range(1, 19)) and m.get('new key') == 20
+    result &= not m.contains_key('key0') and not m.contains_key('key19')
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\nRehash in place example")
+    print("-----------------------")
+    # sort integer keys by the group of a 64 slot table they start in, 16 keys per group
+    m = HashMap(64, lambda key: int(key))
+    groups = [[] for _ in range(4)]
+    number = 0
+    while min(len(group) for group in groups) < GROUP_WIDTH:
+        group = groups[(m._hash(str(number)) >> m._group_shift) & m._group_mask]
+        if len(group) < GROUP_WIDTH:
+            group.append(str(number))
+        number += 1
+    # fill groups 0 and 1, then empty them again: as they were full, every removal leaves a DELETED slot
+    for key in groups[0] + groups[1]:
+        m.put(key, key)
+    for key in groups[0][1:] + groups[1][1:]:
+        m.remove(key)
+    print(m.get_size(), m._tombstones, m.get_capacity())
+    # keys starting in groups 2 and 3 take EMPTY slots there, until full and DELETED slots reach 7/8 of the table
+    for key in groups[2][:12] + groups[3][:12]:
+        m.put(key, key)
+    print(m.get_size(), m._tombstones, m.get_capacity())
+    # live keys fill less than half of that room, so the next put rehashes in place instead of doubling
+    m.put(groups[2][12], groups[2][12])
+    live = [groups[0][0], groups[1][0]] + groups[2][:13] + groups[3][:12]
+    result = m._tombstones == 0 and m.get_capacity() == 64 and m.get_size() == len(live)
+    result &= all(m.get(key) == key for key in live) and not m.contains_key(groups[0][1])
+    print(m.get_size(), m._tombstones, m.get_capacity(), result)